@@ -0,0 +1,62 @@
+import random
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeLLMError(Exception):
+    pass
+
+
+class FakeChatModel(BaseChatModel):
+    # 本地假模型：按配置的延迟与失败率返回“译文”，用于离线基准测试
+    latency: float = 0.05
+    latency_jitter: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+
+    _calls: int = PrivateAttr(default=0)
+    _failures: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _random: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-translation-chat-model"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None,
+                  **kwargs: Any) -> ChatResult:
+        with self._lock:
+            self._calls += 1
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self._failures += 1
+
+        time.sleep(delay)
+        if fail:
+            raise FakeLLMError("fake chat model failure")
+
+        # Echo the human message back, which keeps segment markers and table layout intact
+        text = messages[-1].content if messages else ""
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
@@ -0,0 +1,49 @@
+import random
+from reportlab.lib import colors, pagesizes
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+
+WORDS = (
+    "translation model document chapter system network language performance table result "
+    "method data value report section analysis reference example figure process design"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate_pdf(output_path: str,
+                 pages: int = 10,
+                 paragraphs_per_page: int = 3,
+                 tables_per_page: int = 1,
+                 table_rows: int = 5,
+                 table_cols: int = 4,
+                 seed: int = 0) -> str:
+    # 生成可复现的合成 PDF：每页若干段落与表格，表格中混合文本与数值单元格
+    rng = random.Random(seed)
+    styles = getSampleStyleSheet()
+    story = []
+
+    for page_idx in range(pages):
+        for _ in range(paragraphs_per_page):
+            paragraph = " ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(rng.randint(2, 4)))
+            story.append(Paragraph(paragraph, styles["Normal"]))
+            story.append(Spacer(1, 6))
+
+        for _ in range(tables_per_page):
+            header = [rng.choice(WORDS).capitalize() for _ in range(table_cols)]
+            rows = [
+                [rng.choice(WORDS) if col == 0 else str(rng.randint(1, 9999)) for col in range(table_cols)]
+                for _ in range(table_rows)
+            ]
+            table = Table([header] + rows)
+            table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 0.5, colors.black)]))
+            story.append(table)
+            story.append(Spacer(1, 12))
+
+        if page_idx != pages - 1:
+            story.append(PageBreak())
+
+    SimpleDocTemplate(output_path, pagesize=pagesizes.letter).build(story)
+    return output_path
@@ -1,9 +1,8 @@
-import pandas as pd
-
+import json
 from enum import Enum, auto
+from typing import List, Optional, Tuple
 from PIL import Image as PILImage
 from utils import LOG
-from io import StringIO
 
 class ContentType(Enum):
     TEXT = auto()
@@ -11,11 +10,15 @@ class ContentType(Enum):
     IMAGE = auto()
 
 class Content:
-    def __init__(self, content_type, original, translation=None):
+    __slots__ = ("content_type", "original", "translation", "status", "boilerplate")
+
+    def __init__(self, content_type, original, translation=None, boilerplate=False):
         self.content_type = content_type
         self.original = original
         self.translation = translation
         self.status = False
+        # Running header or footer repeated across pages
+        self.boilerplate = boilerplate
 
     def set_translation(self, translation, status):
         if not self.check_translation_type(translation):
@@ -37,49 +40,83 @@ class Content:
 
 
 class TableContent(Content):
+    # Cells are kept as flat row-major lists of strings plus a (rows, columns) shape.
+    # `original` and `translation` hold these flat lists; the first row is the header.
+    __slots__ = ("shape", "translation_shape")
+
     def __init__(self, data, translation=None):
-        df = pd.DataFrame(data)
+        rows = len(data)
+        columns = max((len(row) for row in data), default=0)
+        if rows == 0 or columns == 0:
+            raise ValueError("The extracted table data is empty.")
 
-        # Verify if the number of rows and columns in the data and DataFrame object match
-        if len(data) != len(df) or len(data[0]) != len(df.columns):
-            raise ValueError("The number of rows and columns in the extracted table data and DataFrame object do not match.")
-        
-        super().__init__(ContentType.TABLE, df)
+        cells = []
+        for row in data:
+            # Short rows are padded so that the table stays rectangular
+            cells.extend("" if cell is None else str(cell) for cell in row)
+            cells.extend([""] * (columns - len(row)))
+
+        super().__init__(ContentType.TABLE, cells)
+        self.shape = (rows, columns)
+        self.translation_shape = None
 
     def set_translation(self, translation, status):
+        # The translation is a grid of cells with the table's shape, as a list of rows or its JSON encoding
         try:
-            if not isinstance(translation, str):
-                raise ValueError(f"Invalid translation type. Expected str, but got {type(translation)}")
-
-            LOG.debug(f"[translation]\n{translation}")
-            # Extract column names from the first set of brackets
-            header = translation.split(']')[0][1:].split(', ')
-            # Extract data rows from the remaining brackets
-            data_rows = translation.split('] ')[1:]
-            # Replace Chinese punctuation and split each row into a list of values
-            data_rows = [row[1:-1].split(', ') for row in data_rows]
-            # Create a DataFrame using the extracted header and data
-            translated_df = pd.DataFrame(data_rows, columns=header)
-            LOG.debug(f"[translated_df]\n{translated_df}")
-            self.translation = translated_df
-            self.status = status
+            rows = json.loads(translation) if isinstance(translation, str) else translation
+            row_count, column_count = self.shape
+            if (not isinstance(rows, list) or len(rows) != row_count
+                    or any(not isinstance(row, list) or len(row) != column_count for row in rows)):
+                raise ValueError(f"Expected a {row_count}x{column_count} grid of cells")
+
+            self.set_translated_rows([[str(cell) for cell in row] for row in rows], status)
+            LOG.debug(f"[translated_table]\n{self.to_text(translated=True)}")
         except Exception as e:
             LOG.error(f"An error occurred during table translation: {e}")
             self.translation = None
+            self.translation_shape = None
             self.status = False
 
+    def set_translated_rows(self, rows: List[List[str]], status: bool):
+        self.translation = [cell for row in rows for cell in row]
+        self.translation_shape = (len(rows), len(rows[0]) if rows else 0)
+        self.status = status
+
     def __str__(self):
-        return self.original.to_string(header=False, index=False)
+        return self.to_text()
+
+    def rows(self, translated=False) -> List[List[str]]:
+        cells, (row_count, column_count) = self._cells(translated)
+        return [cells[row * column_count:(row + 1) * column_count] for row in range(row_count)]
+
+    def to_text(self, translated=False) -> str:
+        # Column-aligned plain text, one table row per line
+        rows = self.rows(translated)
+        widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))] if rows else []
+        return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+    def to_dataframe(self, translated=False):
+        # pandas is only needed by callers that really want a DataFrame
+        import pandas as pd
+
+        rows = self.rows(translated)
+        if translated:
+            return pd.DataFrame(rows[1:], columns=rows[0])
+        return pd.DataFrame(rows)
 
     def iter_items(self, translated=False):
-        target_df = self.translation if translated else self.original
-        for row_idx, row in target_df.iterrows():
-            for col_idx, item in enumerate(row):
-                yield (row_idx, col_idx, item)
+        cells, (_, column_count) = self._cells(translated)
+        for index, item in enumerate(cells):
+            yield (index // column_count, index % column_count, item)
 
     def update_item(self, row_idx, col_idx, new_value, translated=False):
-        target_df = self.translation if translated else self.original
-        target_df.at[row_idx, col_idx] = new_value
+        cells, (_, column_count) = self._cells(translated)
+        cells[row_idx * column_count + col_idx] = new_value
 
     def get_original_as_str(self):
-        return self.original.to_string(header=False, index=False)
\ No newline at end of file
+        return self.to_text()
+
+    def _cells(self, translated: bool) -> Tuple[Optional[List[str]], Tuple[int, int]]:
+        if translated:
+            return self.translation or [], self.translation_shape or (0, 0)
+        return self.original, self.shape
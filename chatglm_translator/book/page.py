@@ -1,8 +1,12 @@
 from .content import Content
 
 class Page:
-    def __init__(self):
+    __slots__ = ("contents", "page_number")
+
+    def __init__(self, page_number=None):
         self.contents = []
+        # 0-based index of the page in the source PDF
+        self.page_number = page_number
 
     def add_content(self, content: Content):
         self.contents.append(content)
@@ -1,11 +1,13 @@
 import sys
 import os
+import hashlib
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, request, send_file, jsonify
-from translator import PDFTranslator, TranslationConfig
-from utils import ArgumentParser, LOG
+from flask import Flask, Response, request, send_file, jsonify
+from translator import PDFTranslator, TranslationConfig, JobManager, JobStatus
+from translator.exceptions import DuplicateJobException
+from utils import ArgumentParser, LOG, METRICS
 
 app = Flask(__name__)
 
@@ -17,6 +19,10 @@ def translation():
         input_file = request.files['input_file']
         source_language = request.form.get('source_language', 'English')
         target_language = request.form.get('target_language', 'Chinese')
+        # 断点续译：跳过上次已完成的片段
+        resume = request.form.get('resume', 'false').lower() in ('1', 'true', 'yes')
+        # 页码范围，例如 "250-260,300"；为空时翻译全书
+        pages = request.form.get('pages') or None
 
         LOG.debug(f"[input_file]\n{input_file}")
         LOG.debug(f"[input_file.filename]\n{input_file.filename}")
@@ -32,7 +38,9 @@ def translation():
             output_file_path = Translator.translate_pdf(
                 input_file=input_file_path,
                 source_language=source_language,
-                target_language=target_language)
+                target_language=target_language,
+                pages=pages,
+                resume=resume)
             
             # 移除临时文件
             # os.remove(input_file_path)
@@ -51,6 +59,80 @@ def translation():
         return jsonify(response), 400
 
 
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    try:
+        input_file = request.files['input_file']
+        if not input_file or not input_file.filename:
+            return jsonify({'status': 'error', 'message': 'input_file is required'}), 400
+
+        # 按文件内容哈希分目录：同名文件互不覆盖，而重新上传同一文件（例如服务崩溃后）
+        # 会落到同一路径，resume=true 即可从其翻译日志继续
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: input_file.stream.read(1 << 20), b''):
+            digest.update(chunk)
+        input_file.stream.seek(0)
+        job_dir = os.path.join(TEMP_FILE_DIR, digest.hexdigest()[:16])
+        os.makedirs(job_dir, exist_ok=True)
+        input_file_path = os.path.join(job_dir, os.path.basename(input_file.filename))
+
+        # 先登记任务再保存文件：同一文件与目标语言的任务正在运行时直接返回 409，
+        # 不会覆盖它正在读取的 PDF 或共用的翻译日志
+        try:
+            job = Jobs.reserve(
+                input_file_path,
+                output_file_format=request.form.get('output_file_format', 'markdown'),
+                source_language=request.form.get('source_language', 'English'),
+                target_language=request.form.get('target_language', 'Chinese'),
+                resume=request.form.get('resume', 'false').lower() in ('1', 'true', 'yes'),
+                pages=request.form.get('pages') or None,
+                weight=float(request.form.get('weight', 1.0)))
+        except DuplicateJobException as e:
+            return jsonify({'status': 'error', 'message': f'job {e.job.job_id} is already translating this file',
+                            'job_id': e.job.job_id}), 409
+
+        try:
+            input_file.save(input_file_path)
+        except Exception:
+            Jobs.release(job)
+            raise
+        Jobs.start(job)
+
+        return jsonify(job.to_dict()), 202
+    except Exception as e:
+        response = {
+            'status': 'error',
+            'message': str(e)
+        }
+        return jsonify(response), 400
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = Jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'job {job_id} not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = Jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'job {job_id} not found'}), 404
+    if job.status != JobStatus.DONE:
+        return jsonify(job.to_dict()), 409
+
+    # 返回翻译后的文件
+    return send_file(os.path.abspath(job.output_file_path), as_attachment=True)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus 抓取接口
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 def initialize_translator():
     # 解析命令行
     argument_parser = ArgumentParser()
@@ -60,8 +142,12 @@ def initialize_translator():
     config = TranslationConfig()
     config.initialize(args)    
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    global Translator
-    Translator = PDFTranslator(config.model_name)
+    global Translator, Jobs
+    Translator = PDFTranslator.from_config(config)
+    # 后台任务队列，/jobs 接口提交的翻译任务由该线程池处理
+    Jobs = JobManager(Translator, workers=getattr(config, "job_workers", 2),
+                      job_ttl=getattr(config, "job_ttl", 24 * 3600))
+    os.makedirs(TEMP_FILE_DIR, exist_ok=True)
 
 
 if __name__ == "__main__":
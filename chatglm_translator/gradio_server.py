@@ -1,19 +1,56 @@
 import sys
 import os
+import queue
+import threading
 import gradio as gr
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils import ArgumentParser, LOG
 from translator import PDFTranslator, TranslationConfig
+from utils.page_range import normalize_pages
 
-def translation(input_file, style, source_language, target_language):
+def translation(input_file, source_language, target_language, style, pages, resume, progress=gr.Progress()):
     LOG.debug(f"[翻译任务]\n源文件: {input_file.name}\n源语言: {source_language}\n目标语言: {target_language}")
 
-    output_file_path = Translator.translate_pdf(
-        input_file.name, style=get_style(style), source_language=source_language, target_language=target_language)
+    pages = pages.strip() or None
+    page_numbers = normalize_pages(pages)
+    total_pages = len(page_numbers) if page_numbers else Translator.pdf_parser.count_pages(input_file.name)
 
-    return output_file_path
+    # 后台线程逐页翻译，每完成一页就把该页的 Markdown 放入队列，界面随之刷新
+    updates = queue.Queue()
+    result = {}
+
+    def on_page(page_idx, page):
+        updates.put(Translator.writer.page_to_markdown(page))
+
+    def run():
+        try:
+            result["output_file_path"] = Translator.translate_pdf_stream(
+                input_file.name, style=get_style(style), source_language=source_language,
+                target_language=target_language, pages=pages, page_callback=on_page, resume=resume)
+        except Exception as e:
+            result["error"] = e
+        finally:
+            updates.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    translated_pages = []
+    progress(0, desc="正在翻译第 1 页")
+    while True:
+        page_markdown = updates.get()
+        if page_markdown is None:
+            break
+        translated_pages.append(page_markdown)
+        progress(len(translated_pages) / total_pages, desc=f"已完成 {len(translated_pages)}/{total_pages} 页")
+        yield "---\n\n".join(translated_pages), None
+
+    if "error" in result:
+        raise gr.Error(f"翻译失败: {result['error']}")
+
+    # 全部页面完成后提供文件下载
+    yield "---\n\n".join(translated_pages), result["output_file_path"]
 
 def launch_gradio():
 
@@ -24,9 +61,12 @@ def launch_gradio():
             gr.File(label="上传PDF文件"),
             gr.Textbox(label="源语言（默认：英文）", placeholder="English", value="English"),
             gr.Textbox(label="目标语言（默认：中文）", placeholder="Chinese", value="Chinese"),
-            gr.Radio(["小说", "新闻", "作家"], lable="请选择翻译风格")
+            gr.Radio(["小说", "新闻", "作家"], label="请选择翻译风格"),
+            gr.Textbox(label="页码范围（可选，例如 250-260,300）", placeholder="全部页面", value=""),
+            gr.Checkbox(label="断点续译（跳过已完成的片段）", value=False)
         ],
         outputs=[
+            gr.Markdown(label="翻译预览"),
             gr.File(label="下载翻译文件")
         ],
         allow_flagging="never"
@@ -44,7 +84,7 @@ def initialize_translator():
     config.initialize(args)    
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
     global Translator
-    Translator = PDFTranslator(config.model_name)
+    Translator = PDFTranslator.from_config(config)
 
 
 def get_style(style):
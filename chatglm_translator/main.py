@@ -4,7 +4,8 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils import ArgumentParser, LOG
-from translator import PDFTranslator, TranslationConfig
+from translator import PDFTranslator, TranslationConfig, BatchTranslator
+from translator.scheduler import FairScheduler
 
 if __name__ == "__main__":
     # 解析命令行
@@ -16,5 +17,40 @@ if __name__ == "__main__":
     config.initialize(args)    
 
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    translator = PDFTranslator(config.model_name)
-    translator.translate_pdf(config.input_file, config.output_file_format, pages=None)
+    translator = PDFTranslator.from_config(config)
+    resume = getattr(config, "resume", False)
+    pages = getattr(config, "pages", None)
+    previous_edition = getattr(config, "previous_edition", None)
+    # 未指定时沿用默认的英译中
+    languages = {
+        "source_language": getattr(config, "source_language", None) or "English",
+        "target_language": getattr(config, "target_language", None) or "Chinese",
+    }
+    if getattr(config, "batch", None):
+        # 批量模式：所有文件共享同一个翻译链、限流器与并发预算
+        if translator.scheduler is None:
+            translator.scheduler = FairScheduler(translator.max_workers)
+        batch = BatchTranslator(translator, file_workers=getattr(config, "batch_workers", 2))
+        input_files = BatchTranslator.collect_inputs(config.batch)
+        results = batch.run(input_files, output_file_format=config.output_file_format, pages=pages, resume=resume,
+                            **languages)
+        if getattr(config, "batch_report", None):
+            BatchTranslator.save_report(results, config.batch_report)
+    elif getattr(config, "target_languages", None):
+        # 多语言模式：只解析一次 PDF，各目标语言共享同一并发与限流预算
+        target_languages = config.target_languages
+        if isinstance(target_languages, str):
+            target_languages = [language.strip() for language in target_languages.split(",") if language.strip()]
+        translator.translate_pdf_multi(config.input_file, config.output_file_format,
+                                       source_language=getattr(config, "source_language", "English"),
+                                       target_languages=target_languages, pages=pages, resume=resume)
+    elif previous_edition:
+        # 版本比对需要完整的片段序列，因此使用非流式翻译
+        translator.translate_pdf(config.input_file, config.output_file_format, pages=pages, resume=resume,
+                                 previous_edition=previous_edition, **languages)
+    elif getattr(config, "stream", False):
+        translator.translate_pdf_stream(config.input_file, config.output_file_format, pages=pages, resume=resume,
+                                        **languages)
+    else:
+        translator.translate_pdf(config.input_file, config.output_file_format, pages=pages, resume=resume,
+                                 **languages)
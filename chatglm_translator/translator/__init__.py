@@ -1,2 +1,4 @@
 from .pdf_translator import PDFTranslator
-from .translation_config import TranslationConfig
\ No newline at end of file
+from .translation_config import TranslationConfig
+from .job_manager import JobManager, JobStatus
+from .batch_translator import BatchTranslator
\ No newline at end of file
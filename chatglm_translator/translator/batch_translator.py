@@ -0,0 +1,94 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from translator.job_journal import JobJournal
+from utils import LOG
+
+
+class BatchResult:
+    __slots__ = ("input_file", "output_file", "status", "error", "completed_segments", "failed_segments", "seconds")
+
+    def __init__(self, input_file: str):
+        self.input_file = input_file
+        self.output_file = None
+        self.status = "pending"
+        self.error = None
+        self.completed_segments = 0
+        self.failed_segments = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BatchTranslator:
+    # Translates many PDFs in one process with a single PDFTranslator, so the chain, translation
+    # memory, rate limiter and scheduler are built once and shared by every file.
+    def __init__(self, translator, file_workers: int = 2):
+        self.translator = translator
+        self.file_workers = max(1, file_workers)
+
+    @staticmethod
+    def collect_inputs(pattern: str) -> List[str]:
+        # A directory selects every PDF below it; anything else is treated as a glob pattern
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*.pdf")
+        return sorted(
+            path for path in glob.glob(pattern, recursive=True)
+            if path.lower().endswith(".pdf") and "_translated" not in os.path.basename(path)
+        )
+
+    def run(self, input_files: List[str], **translate_options) -> List[BatchResult]:
+        results = [BatchResult(input_file) for input_file in input_files]
+        LOG.info(f"批量翻译: {len(input_files)} 个文件，{self.file_workers} 个文件并行")
+
+        with ThreadPoolExecutor(max_workers=self.file_workers, thread_name_prefix="batch-file") as executor:
+            for future in [executor.submit(self._translate_file, result, translate_options) for result in results]:
+                future.result()
+
+        self._log_report(results)
+        return results
+
+    def _translate_file(self, result: BatchResult, translate_options: dict):
+        name = os.path.basename(result.input_file)
+        start = time.perf_counter()
+        result.status = "running"
+
+        def on_progress(done, total):
+            LOG.info(f"[{name}] 翻译进度: {done}/{total}")
+
+        try:
+            result.output_file = self.translator.translate_pdf(
+                result.input_file, progress_callback=on_progress, **translate_options)
+            result.status = "done"
+        except Exception as e:
+            # One broken file must not stop the rest of the batch
+            result.status = "failed"
+            result.error = str(e)
+            LOG.error(f"[{name}] 翻译失败: {e}")
+        finally:
+            result.seconds = round(time.perf_counter() - start, 3)
+
+        target_language = translate_options.get("target_language", "Chinese")
+        journal_path = JobJournal.path_for(result.input_file, target_language)
+        if os.path.exists(journal_path):
+            result.completed_segments, result.failed_segments = JobJournal.summarize(journal_path)
+
+    def _log_report(self, results: List[BatchResult]):
+        for result in results:
+            LOG.info(
+                f"[{os.path.basename(result.input_file)}] {result.status}: "
+                f"{result.completed_segments} 个片段完成，{result.failed_segments} 个片段失败，"
+                f"耗时 {result.seconds} 秒" + (f"，错误: {result.error}" if result.error else "")
+            )
+        failed_files = sum(1 for result in results if result.status != "done")
+        LOG.info(f"批量翻译完成: {len(results) - failed_files} 个文件成功，{failed_files} 个文件失败")
+
+    @staticmethod
+    def save_report(results: List[BatchResult], report_path: str):
+        with open(report_path, 'w', encoding='utf-8') as report_file:
+            json.dump([result.to_dict() for result in results], report_file, ensure_ascii=False, indent=2)
+        LOG.info(f"批量翻译报告已保存至: {report_path}")
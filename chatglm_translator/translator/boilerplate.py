@@ -0,0 +1,154 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from book import Book, Content, ContentType
+from translator.fuzzy_match import mask_placeholders, substitute_placeholders
+from utils import LOG
+
+BOILERPLATE_MODES = ("reuse", "drop", "keep")
+
+
+def _line_signature(line: str) -> str:
+    # Running headers differ from page to page only in their numbers ("Chapter 3 · 41")
+    return re.sub(r"\d+", "#", re.sub(r"\s+", " ", line).strip().lower())
+
+
+class BoilerplateDetector:
+    def __init__(self, mode: str = "reuse", edge_lines: int = 3, min_pages: int = 3, min_ratio: float = 0.3):
+        if mode not in BOILERPLATE_MODES:
+            raise ValueError(f"Unknown boilerplate mode '{mode}', expected one of {', '.join(BOILERPLATE_MODES)}")
+        # reuse: move repeated lines into their own segments, translated once per job; drop: remove them
+        self.mode = mode
+        # Only this many lines at the top and bottom of a page are considered headers or footers
+        self.edge_lines = edge_lines
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+
+    def apply(self, book: Book) -> int:
+        # Returns the number of boilerplate lines found across the book
+        if self.mode == "keep":
+            return 0
+        page_lines = [self._page_lines(page) for page in book.pages]
+        repeated = self.detect([lines for _, lines in page_lines])
+        if not repeated:
+            return 0
+
+        found = 0
+        for page, (content, lines) in zip(book.pages, page_lines):
+            if content is None:
+                continue
+            header, body, footer = self._split(lines, repeated)
+            if not header and not footer:
+                continue
+            found += len(header) + len(footer)
+
+            index = page.contents.index(content)
+            if body:
+                content.original = "\n".join(body)
+                replacement = [content]
+            else:
+                replacement = []
+            if self.mode == "reuse":
+                if header:
+                    replacement.insert(0, Content(ContentType.TEXT, "\n".join(header), boilerplate=True))
+                if footer:
+                    replacement.append(Content(ContentType.TEXT, "\n".join(footer), boilerplate=True))
+            page.contents[index:index + 1] = replacement
+
+        action = "单独翻译一次后复用" if self.mode == "reuse" else "已删除"
+        LOG.info(f"检测到 {len(repeated)} 种页眉/页脚，共 {found} 行，{action}")
+        return found
+
+    def detect(self, pages: List[List[str]]) -> Set[Tuple[str, int, str]]:
+        # A line is boilerplate when the same text (numbers aside) sits at the same position from
+        # the top or bottom of many pages
+        positions = Counter()
+        for lines in pages:
+            positions.update(set(self._edge_positions(lines)))
+
+        threshold = max(self.min_pages, math.ceil(self.min_ratio * len(pages)))
+        return {position for position, count in positions.items() if count >= threshold}
+
+    def _edge_positions(self, lines: List[str]):
+        edge = min(self.edge_lines, len(lines))
+        for offset in range(edge):
+            yield "top", offset, _line_signature(lines[offset])
+            yield "bottom", offset, _line_signature(lines[-1 - offset])
+
+    def _split(self, lines: List[str], repeated: Set[Tuple[str, int, str]]):
+        # Headers and footers are the unbroken runs of repeated lines at either edge of the page
+        edge = min(self.edge_lines, len(lines))
+        top, bottom = set(), set()
+        for offset in range(edge):
+            if ("top", offset, _line_signature(lines[offset])) not in repeated:
+                break
+            top.add(offset)
+        for offset in range(edge):
+            index = len(lines) - 1 - offset
+            if index in top or ("bottom", offset, _line_signature(lines[index])) not in repeated:
+                break
+            bottom.add(index)
+        header = [lines[index] for index in sorted(top)]
+        footer = [lines[index] for index in sorted(bottom)]
+        body = [line for index, line in enumerate(lines) if index not in top and index not in bottom]
+        return header, body, footer
+
+    @staticmethod
+    def _page_lines(page) -> Tuple[Optional[Content], List[str]]:
+        # The parser puts a page's body text into its first text segment
+        for content in page.contents:
+            if content.content_type == ContentType.TEXT:
+                return content, content.original.splitlines()
+        return None, []
+
+
+class BoilerplateCache:
+    # Translations of headers and footers within one job. The first occurrence of each is translated;
+    # later ones reuse it with their own page numbers swapped in.
+    def __init__(self):
+        self._lock = threading.Lock()
+        # masked text -> [leader source, translation (None while in flight), waiting followers]
+        self._entries: Dict[str, list] = {}
+
+    def claim(self, content: Content) -> Tuple[bool, Optional[str]]:
+        # Returns (handled, translation). Not handled: translate the content itself.
+        # Handled without a translation: it is filled in once the first occurrence finishes.
+        masked = mask_placeholders(str(content))[0]
+        with self._lock:
+            entry = self._entries.get(masked)
+            if entry is None:
+                self._entries[masked] = [str(content), None, []]
+                return False, None
+            source, translation, followers = entry
+            if translation is None:
+                followers.append(content)
+                return True, None
+        adapted = substitute_placeholders(source, translation, str(content))
+        return adapted is not None, adapted
+
+    def resolve(self, content: Content, translation: str, status: bool,
+                finish: Callable[[Content, Optional[str]], None]) -> Optional[Content]:
+        # Called when a leader finishes. On success the followers get the adapted translation, or None when
+        # they have to be translated on their own. On failure the first follower becomes the leader and is
+        # returned for the caller to translate, while the others keep waiting on it.
+        masked = mask_placeholders(str(content))[0]
+        with self._lock:
+            entry = self._entries.get(masked)
+            if entry is None or entry[0] != str(content) or entry[1] is not None:
+                return None
+            if not status:
+                if not entry[2]:
+                    # Nobody is waiting, so the next occurrence claimed becomes the leader
+                    del self._entries[masked]
+                    return None
+                leader = entry[2].pop(0)
+                entry[0] = str(leader)
+                return leader
+            entry[1] = translation
+            followers, entry[2] = entry[2], []
+
+        for follower in followers:
+            finish(follower, substitute_placeholders(str(content), translation, str(follower)))
+        return None
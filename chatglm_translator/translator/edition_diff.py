@@ -0,0 +1,89 @@
+import os
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from translator.job_journal import JobJournal
+from translator.translation_memory import TranslationMemory
+from utils import LOG
+
+REFERENCE_INSTRUCTION = (
+    "An earlier edition of this text has already been translated. Keep the earlier translation's "
+    "wording wherever the source is unchanged and only adapt the parts that differ.\n"
+    "Earlier source:\n{source}\n"
+    "Earlier translation:\n{translation}"
+)
+
+
+class EditionMatch:
+    __slots__ = ("kind", "source", "translation", "ratio")
+
+    def __init__(self, kind: str, source: str, translation: str, ratio: float):
+        # kind is "exact" (reuse the translation) or "fuzzy" (retranslate with the old one as reference)
+        self.kind = kind
+        self.source = source
+        self.translation = translation
+        self.ratio = ratio
+
+
+class PreviousEdition:
+    def __init__(self, segments: List[dict]):
+        # Finished segments of the earlier run in document order: {"hash", "source", "translation"}
+        self.segments = segments
+
+    @classmethod
+    def load(cls, path: str, target_language: str) -> "PreviousEdition":
+        # Accepts the earlier edition's PDF (its journal is located next to it) or the journal itself
+        journal_path = path if path.endswith(".jsonl") else JobJournal.path_for(path, target_language)
+        if not os.path.exists(journal_path):
+            raise FileNotFoundError(f"No translation journal found for the previous edition: {journal_path}")
+
+        records = JobJournal.read_records(journal_path)
+        segments = [
+            record for _, record in sorted(records.items())
+            if record["status"] and record.get("source") is not None
+        ]
+        LOG.info(f"已加载旧版本的 {len(segments)} 个已翻译片段: {journal_path}")
+        return cls(segments)
+
+    def align(self, sources: List[str], keys: List[str], fuzzy_threshold: float = 0.6) -> List[Optional[EditionMatch]]:
+        matches: List[Optional[EditionMatch]] = [None] * len(sources)
+
+        # Unchanged segments are found by hash wherever they moved to
+        by_hash: Dict[str, dict] = {}
+        for segment in self.segments:
+            by_hash.setdefault(segment["hash"], segment)
+        for index, key in enumerate(keys):
+            segment = by_hash.get(key)
+            if segment is not None:
+                matches[index] = EditionMatch("exact", segment["source"], segment["translation"], 1.0)
+
+        # Edited segments are paired positionally inside the blocks that differ between the editions
+        old_keys = [segment["hash"] for segment in self.segments]
+        opcodes = SequenceMatcher(None, old_keys, keys, autojunk=False).get_opcodes()
+        for tag, old_start, old_end, new_start, new_end in opcodes:
+            if tag != "replace":
+                continue
+            for old_index, new_index in zip(range(old_start, old_end), range(new_start, new_end)):
+                if matches[new_index] is not None:
+                    continue
+                segment = self.segments[old_index]
+                ratio = _similarity(segment["source"], sources[new_index], fuzzy_threshold)
+                if ratio >= fuzzy_threshold:
+                    matches[new_index] = EditionMatch("fuzzy", segment["source"], segment["translation"], ratio)
+
+        return matches
+
+
+def _similarity(old: str, new: str, threshold: float) -> float:
+    old = TranslationMemory.normalize(old)
+    new = TranslationMemory.normalize(new)
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    # The cheap upper bounds rule out unrelated segments before the full comparison
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+def summarize(matches: List[Optional[EditionMatch]]) -> Tuple[int, int, int]:
+    exact = sum(1 for match in matches if match is not None and match.kind == "exact")
+    fuzzy = sum(1 for match in matches if match is not None and match.kind == "fuzzy")
+    return exact, fuzzy, len(matches) - exact - fuzzy
@@ -3,3 +3,9 @@ class PageOutOfRangeException(Exception):
         self.book_pages = book_pages
         self.requested_pages = requested_pages
         super().__init__(f"Page out of range: Book has {book_pages} pages, but {requested_pages} pages were requested.")
+
+
+class DuplicateJobException(Exception):
+    def __init__(self, job):
+        self.job = job
+        super().__init__(f"Job {job.job_id} is already translating {job.input_file}.")
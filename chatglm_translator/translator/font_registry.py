@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, Optional
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from utils import LOG
+
+DEFAULT_FONTS = {
+    "SimSun": "../fonts/simsun.ttc",  # 请将此路径替换为您的字体文件路径
+}
+
+
+class FontRegistry:
+    # Parsing a large TTC takes seconds, so each font is registered with reportlab once per process.
+    # reportlab embeds TrueType fonts as subsets holding only the glyphs a document uses.
+    _registered = set()
+    _lock = threading.Lock()
+
+    def __init__(self, fonts: Optional[Dict[str, str]] = None, default_font: str = "SimSun"):
+        self.fonts = dict(fonts or DEFAULT_FONTS)
+        self.default_font = default_font
+        self._styles = {}
+
+    def ensure_registered(self, font_name: Optional[str] = None) -> str:
+        font_name = font_name or self.default_font
+        with FontRegistry._lock:
+            if font_name not in FontRegistry._registered:
+                font_path = self.fonts[font_name]
+                LOG.info(f"注册字体: {font_name} ({font_path})")
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+                FontRegistry._registered.add(font_name)
+        return font_name
+
+    def paragraph_style(self, font_name: Optional[str] = None, font_size: int = 12, leading: int = 14) -> ParagraphStyle:
+        font_name = self.ensure_registered(font_name)
+        key = (font_name, font_size, leading)
+        if key not in self._styles:
+            self._styles[key] = ParagraphStyle(font_name, fontName=font_name, fontSize=font_size, leading=leading)
+        return self._styles[key]
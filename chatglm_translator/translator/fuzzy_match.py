@@ -0,0 +1,114 @@
+import hashlib
+import random
+import re
+from typing import List, Optional, Set, Tuple
+
+EXAMPLES_INSTRUCTION = (
+    "Similar sentences have been translated before. Follow their terminology and phrasing "
+    "where they overlap with the text:\n{examples}"
+)
+
+# Values that may differ between otherwise identical segments and are copied verbatim into a translation
+PLACEHOLDER_PATTERN = re.compile(
+    r"https?://\S+|www\.\S+"
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"
+    r"|\b(?=[A-Za-z][\w-]*\d)[A-Za-z][\w-]*"
+    r"|\b[A-Z][a-z]+[A-Z]\w*"
+    r"|\b[A-Z]{2,}\b"
+    r"|\d+(?:[.,:/-]\d+)*%?"
+)
+PLACEHOLDER = "\u0000"
+
+# Upper bound on the examples added to a packed request, which merges the examples of all its segments
+MAX_PACKED_EXAMPLES = 10
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240607)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+class FuzzyMatch:
+    __slots__ = ("source", "translation", "similarity")
+
+    def __init__(self, source: str, translation: str, similarity: float):
+        self.source = source
+        self.translation = translation
+        self.similarity = similarity
+
+
+def mask_placeholders(text: str) -> Tuple[str, List[str]]:
+    text = re.sub(r"\s+", " ", text).strip()
+    values = PLACEHOLDER_PATTERN.findall(text)
+    return PLACEHOLDER_PATTERN.sub(PLACEHOLDER, text), values
+
+
+def shingles(text: str) -> Set[str]:
+    # Character n-grams of the masked text, so that segments differing only in numbers or names look identical
+    masked = mask_placeholders(text)[0].lower()
+    if len(masked) <= SHINGLE_SIZE:
+        return {masked}
+    return {masked[i:i + SHINGLE_SIZE] for i in range(len(masked) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_bands(shingle_set: Set[str]) -> List[str]:
+    # MinHash signature split into bands; two segments become candidates when any band is identical
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+              for s in shingle_set]
+    if not hashes:
+        return []
+    signature = [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [
+        f"{band}:" + hashlib.blake2b(repr(signature[band * rows:(band + 1) * rows]).encode("ascii"), digest_size=8).hexdigest()
+        for band in range(LSH_BANDS)
+    ]
+
+
+def substitute_placeholders(source: str, translation: str, new_source: str) -> Optional[str]:
+    # Reuse a stored translation for a segment that differs only in its placeholder values.
+    # Returns None unless every changed value can be found and replaced unambiguously.
+    old_masked, old_values = mask_placeholders(source)
+    new_masked, new_values = mask_placeholders(new_source)
+    if old_masked != new_masked or len(old_values) != len(new_values):
+        return None
+
+    mapping = {}
+    for old, new in zip(old_values, new_values):
+        if mapping.setdefault(old, new) != new:
+            return None
+    changed = {old: new for old, new in mapping.items() if old != new}
+    if not changed:
+        return translation
+
+    pattern = re.compile(
+        r"(?<![A-Za-z0-9])(" + "|".join(re.escape(old) for old in sorted(changed, key=len, reverse=True)) + r")(?![A-Za-z0-9])"
+    )
+    if {match.group(1) for match in pattern.finditer(translation)} != set(changed):
+        return None
+    return pattern.sub(lambda match: changed[match.group(1)], translation)
+
+
+def merge_examples(match_lists: List[List[FuzzyMatch]], limit: int = MAX_PACKED_EXAMPLES) -> List[FuzzyMatch]:
+    # The most similar examples first, each earlier source only once
+    merged = {}
+    for match in sorted((match for matches in match_lists for match in matches),
+                        key=lambda match: match.similarity, reverse=True):
+        merged.setdefault(match.source, match)
+    return list(merged.values())[:limit]
+
+
+def format_examples(matches: List[FuzzyMatch]) -> str:
+    return EXAMPLES_INSTRUCTION.format(
+        examples="\n".join(f"Source: {match.source}\nTranslation: {match.translation}" for match in matches)
+    )
@@ -0,0 +1,154 @@
+import csv
+import json
+import os
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from utils import LOG
+
+GLOSSARY_INSTRUCTION = (
+    "Translate the following terms exactly as given, keeping them consistent across the text:\n{terms}"
+)
+
+
+def _fold(text: str) -> str:
+    # Case-insensitive matching without changing string length, so match offsets stay valid
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def _is_word_char(char: str) -> bool:
+    # Word boundaries only apply to alphabetic scripts; CJK terms may sit anywhere in a sentence
+    return char.isascii() and (char.isalnum() or char == "_")
+
+
+class Glossary:
+    def __init__(self, entries: Dict[str, Dict[Optional[str], str]]):
+        # term -> {target language (lower-case, None for any language): translation}
+        self.entries = {term: translations for term, translations in entries.items() if term.strip()}
+        self.terms: List[str] = list(self.entries)
+        self._build_automaton()
+
+    @classmethod
+    def load(cls, path: str) -> "Glossary":
+        # .json/.yaml: {"term": "translation"} or {"term": {"German": "...", "French": "..."}}
+        # .csv/.tsv: a header row "term,<language>,<language>..." followed by one term per row
+        extension = os.path.splitext(path)[1].lower()
+        entries: Dict[str, Dict[Optional[str], str]] = {}
+
+        if extension in (".csv", ".tsv"):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f, delimiter="\t" if extension == ".tsv" else ","))
+            if not rows:
+                return cls({})
+            languages = [language.strip() for language in rows[0][1:]]
+            for row in rows[1:]:
+                if not row or not row[0].strip():
+                    continue
+                translations = entries.setdefault(row[0].strip(), {})
+                for language, translation in zip(languages, row[1:]):
+                    if translation.strip():
+                        translations[language.lower() or None] = translation.strip()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                if extension in (".yaml", ".yml"):
+                    import yaml
+                    data = yaml.safe_load(f) or {}
+                else:
+                    data = json.load(f)
+            for term, value in data.items():
+                if isinstance(value, dict):
+                    entries[str(term)] = {str(language).lower(): str(translation) for language, translation in value.items()}
+                else:
+                    entries[str(term)] = {None: str(value)}
+
+        LOG.info(f"已加载术语表: {len(entries)} 个术语 ({path})")
+        return cls(entries)
+
+    def _build_automaton(self):
+        # Aho-Corasick: a trie over the folded terms plus failure links, built once per glossary
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Index of the term ending at this node, and the nearest node on the failure chain that ends a term
+        self._term_at: List[Optional[int]] = [None]
+        self._output_link: List[Optional[int]] = [None]
+
+        for index, term in enumerate(self.terms):
+            node = 0
+            for char in _fold(term):
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._term_at.append(None)
+                    self._output_link.append(None)
+                node = next_node
+            if self._term_at[node] is None:
+                self._term_at[node] = index
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                suffix = self._fail[child]
+                self._output_link[child] = suffix if self._term_at[suffix] is not None else self._output_link[suffix]
+                queue.append(child)
+
+    def find_terms(self, text: str) -> List[str]:
+        # One pass over the text; overlapping hits are resolved in favour of the earliest, then longest term
+        hits: List[Tuple[int, int, int]] = []
+        node = 0
+        folded = _fold(text)
+        for end, char in enumerate(folded, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            match = node if self._term_at[node] is not None else self._output_link[node]
+            while match is not None:
+                index = self._term_at[match]
+                start = end - len(self.terms[index])
+                if self._on_word_boundary(text, start, end):
+                    hits.append((start, end, index))
+                match = self._output_link[match]
+
+        found: List[str] = []
+        seen = set()
+        covered_until = 0
+        for start, end, index in sorted(hits, key=lambda hit: (hit[0], hit[0] - hit[1])):
+            if start < covered_until:
+                continue
+            covered_until = end
+            if index not in seen:
+                seen.add(index)
+                found.append(self.terms[index])
+        return found
+
+    @staticmethod
+    def _on_word_boundary(text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+            return False
+        return True
+
+    def lookup(self, text: str, target_language: str) -> List[Tuple[str, str]]:
+        language = target_language.strip().lower()
+        matched = []
+        for term in self.find_terms(text):
+            translations = self.entries[term]
+            translation = translations.get(language, translations.get(None))
+            if translation is not None:
+                matched.append((term, translation))
+        return matched
+
+    def instruction_for(self, text: str, target_language: str) -> str:
+        # Only the terms occurring in this text are sent, so the prompt grows with the matches, not the glossary
+        matched = self.lookup(text, target_language)
+        if not matched:
+            return ""
+        return GLOSSARY_INSTRUCTION.format(terms="\n".join(f"{term} => {translation}" for term, translation in matched))
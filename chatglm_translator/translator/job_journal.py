@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from typing import Optional, Tuple
+from utils import LOG
+
+
+class JobJournal:
+    def __init__(self, journal_path: str, resume: bool = False):
+        self.journal_path = journal_path
+        self._lock = threading.Lock()
+        # (page_idx, content_idx) -> latest record for that segment
+        self._records = {}
+
+        if resume and os.path.exists(journal_path):
+            self._load()
+            LOG.info(f"从日志恢复翻译任务: {journal_path} ({self.completed_count()} 个片段已完成)")
+
+        # Appending keeps what was loaded; a fresh job starts from an empty journal
+        self._file = open(journal_path, 'a' if resume else 'w', encoding='utf-8')
+
+    @staticmethod
+    def path_for(input_file: str, target_language: str) -> str:
+        return f"{os.path.splitext(input_file)[0]}_{target_language}.journal.jsonl"
+
+    def _load(self):
+        self._records = self.read_records(self.journal_path)
+
+    @staticmethod
+    def read_records(journal_path: str) -> dict:
+        # (page_idx, content_idx) -> latest record for that segment
+        records = {}
+        with open(journal_path, 'r', encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be cut short if the process died while writing it
+                    continue
+                records[(record["page"], record["content"])] = record
+        return records
+
+    @classmethod
+    def summarize(cls, journal_path: str) -> Tuple[int, int]:
+        records = cls.read_records(journal_path).values()
+        completed = sum(1 for record in records if record["status"])
+        return completed, len(records) - completed
+
+    def completed_count(self) -> int:
+        return sum(1 for record in self._records.values() if record["status"])
+
+    def lookup(self, page_idx: int, content_idx: int, input_hash: str) -> Optional[str]:
+        # Only finished segments whose source is unchanged are reused; failed ones are translated again
+        record = self._records.get((page_idx, content_idx))
+        if record is None or not record["status"] or record["hash"] != input_hash:
+            return None
+        return record["translation"]
+
+    def record(self, page_idx: int, content_idx: int, input_hash: str, translation: str, status: bool,
+               source: Optional[str] = None):
+        record = {
+            "page": page_idx,
+            "content": content_idx,
+            "hash": input_hash,
+            "translation": translation,
+            "status": status,
+            # The source text lets a later edition of the document be aligned against this run
+            "source": source,
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._records[(page_idx, content_idx)] = record
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
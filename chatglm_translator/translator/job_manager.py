@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Optional
+from translator.exceptions import DuplicateJobException
+from utils import LOG
+from utils.metrics import QUEUE_DEPTH
+from utils.page_range import normalize_pages
+
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class QueuedJob:
+    def __init__(self, job_id: str, input_file: str, options: dict):
+        self.job_id = job_id
+        self.input_file = input_file
+        self.options = options
+        self.status = JobStatus.PENDING
+        self.total_pages = None
+        self.pages_done = 0
+        self.output_file_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "total_pages": self.total_pages,
+            "pages_done": self.pages_done,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    # Runs translation jobs on a background worker pool so that HTTP requests only enqueue and poll
+    def __init__(self, translator, workers: int = 2, job_ttl: float = 24 * 3600):
+        self.translator = translator
+        self.workers = max(1, workers)
+        # Finished jobs are forgotten after this many seconds, so a long-running server does not keep them all
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translation-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        QUEUE_DEPTH.set_function(self.queue_depth)
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def submit(self, input_file: str, job_id: Optional[str] = None, **options) -> QueuedJob:
+        job = self.reserve(input_file, job_id, **options)
+        self.start(job)
+        return job
+
+    def reserve(self, input_file: str, job_id: Optional[str] = None, **options) -> QueuedJob:
+        # Registers a pending job without running it, so that the caller can write the input file first.
+        # Jobs on the same file and language share a journal and the input file, so only one of them may
+        # be pending or running at a time; the check and the registration happen under one lock.
+        job = QueuedJob(job_id or self.new_job_id(), input_file, options)
+        with self._lock:
+            self._evict_finished()
+            for other in self._jobs.values():
+                if (other.input_file == input_file
+                        and other.options.get("target_language") == options.get("target_language")
+                        and other.status in (JobStatus.PENDING, JobStatus.RUNNING)):
+                    raise DuplicateJobException(other)
+            self._jobs[job.job_id] = job
+        return job
+
+    def start(self, job: QueuedJob):
+        self._executor.submit(self._run, job)
+        LOG.info(f"[job {job.job_id}] 已加入队列: {job.input_file}")
+
+    def release(self, job: QueuedJob):
+        # Drops a reserved job that will not be started
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        with self._lock:
+            self._evict_finished()
+            return self._jobs.get(job_id)
+
+    def _evict_finished(self):
+        # Called with the lock held
+        expired_before = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < expired_before]:
+            del self._jobs[job_id]
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == JobStatus.PENDING)
+
+    def _run(self, job: QueuedJob):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+
+        def on_page(page_idx, page):
+            job.pages_done = page_idx + 1
+
+        try:
+            # A page selection only counts its own pages
+            selected = normalize_pages(job.options.get("pages"))
+            job.total_pages = (
+                len(selected) if selected is not None else self.translator.pdf_parser.count_pages(job.input_file)
+            )
+            job.output_file_path = self.translator.translate_pdf_stream(
+                job.input_file, page_callback=on_page, **job.options)
+            job.status = JobStatus.DONE
+            LOG.info(f"[job {job.job_id}] 翻译完成: {job.output_file_path}")
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            LOG.error(f"[job {job.job_id}] 翻译失败: {e}")
+        finally:
+            job.finished_at = time.time()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
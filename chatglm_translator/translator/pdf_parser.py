@@ -1,58 +1,139 @@
 import pdfplumber
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
 from book import Book, Page, Content, ContentType, TableContent
 from translator.exceptions import PageOutOfRangeException
+from translator.boilerplate import BoilerplateDetector
 from utils import LOG
+from utils.metrics import PARSE_SECONDS, PARSED_PAGES
+from utils.page_range import PageSelection, normalize_pages
+
+
+def _parse_page_range(pdf_file_path: str, page_numbers: List[int]) -> List[Page]:
+    # Runs in a worker process: every worker opens the file on its own, loading only its pages
+    parser = PDFParser()
+    parsed_pages = []
+    with pdfplumber.open(pdf_file_path, pages=page_numbers) as pdf:
+        for pdf_page in pdf.pages:
+            parsed_pages.append(parser._parse_page(pdf_page))
+            pdf_page.close()
+    return parsed_pages
 
 
 class PDFParser:
-    def __init__(self):
-        pass
+    def __init__(self, workers: int = 1, boilerplate: Optional[BoilerplateDetector] = None):
+        # Number of processes used by parse_pdf; 1 parses in the calling process
+        self.workers = max(1, workers)
+        # Cross-page pass over the whole book that separates running headers and footers from the body
+        self.boilerplate = boilerplate
 
-    def parse_pdf(self, pdf_file_path: str, pages: Optional[int] = None) -> Book:
+    def parse_pdf(self, pdf_file_path: str, pages: PageSelection = None) -> Book:
         book = Book(pdf_file_path)
 
+        with PARSE_SECONDS.time():
+            if self.workers > 1:
+                parsed_pages = self._parse_pages_parallel(pdf_file_path, pages)
+            else:
+                parsed_pages = self.iter_pages(pdf_file_path, pages)
+
+            for page in parsed_pages:
+                book.add_page(page)
+
+        if self.boilerplate is not None:
+            self.boilerplate.apply(book)
+
+        return book
+
+    def count_pages(self, pdf_file_path: str) -> int:
         with pdfplumber.open(pdf_file_path) as pdf:
-            if pages is not None and pages > len(pdf.pages):
-                raise PageOutOfRangeException(len(pdf.pages), pages)
+            return len(pdf.pages)
 
-            if pages is None:
-                pages_to_parse = pdf.pages
-            else:
-                pages_to_parse = pdf.pages[:pages]
+    def _resolve_pages(self, pdf_file_path: str, pages: PageSelection) -> List[int]:
+        total_pages = self.count_pages(pdf_file_path)
+        page_numbers = normalize_pages(pages)
+        if page_numbers is None:
+            return list(range(1, total_pages + 1))
+        if page_numbers[-1] > total_pages:
+            raise PageOutOfRangeException(total_pages, page_numbers[-1])
+        return page_numbers
 
-            for pdf_page in pages_to_parse:
-                page = Page()
+    def _parse_pages_parallel(self, pdf_file_path: str, pages: PageSelection = None) -> List[Page]:
+        page_numbers = self._resolve_pages(pdf_file_path, pages)
 
-                # Store the original text content
-                raw_text = pdf_page.extract_text()
-                tables = pdf_page.extract_tables()
+        # Several small ranges per worker keep the processes busy when some pages are much heavier than others
+        chunk_size = max(1, -(-len(page_numbers) // (self.workers * 4)))
+        chunks = [page_numbers[start:start + chunk_size] for start in range(0, len(page_numbers), chunk_size)]
+        LOG.debug(f"[parse_pdf] {len(page_numbers)} pages in {len(chunks)} ranges on {self.workers} processes")
 
-                # Remove each cell's content from the original text
-                for table_data in tables:
-                    for row in table_data:
-                        for cell in row:
-                            raw_text = raw_text.replace(cell, "", 1)
+        parsed_pages = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # map() yields the ranges in submission order, so pages come back in document order
+            for chunk in executor.map(_parse_page_range, [pdf_file_path] * len(chunks), chunks):
+                parsed_pages.extend(chunk)
 
-                # Handling text
-                if raw_text:
-                    # Remove empty lines and leading/trailing whitespaces
-                    raw_text_lines = raw_text.splitlines()
-                    cleaned_raw_text_lines = [line.strip() for line in raw_text_lines if line.strip()]
-                    cleaned_raw_text = "\n".join(cleaned_raw_text_lines)
+        PARSED_PAGES.inc(len(parsed_pages))
+        return parsed_pages
 
-                    text_content = Content(content_type=ContentType.TEXT, original=cleaned_raw_text)
-                    page.add_content(text_content)
-                    LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
+    def iter_pages(self, pdf_file_path: str, pages: PageSelection = None) -> Iterator[Page]:
+        # Parse lazily so that callers can translate and write a page before the next one is read
+        page_numbers = normalize_pages(pages)
 
+        # Only the selected pages are loaded by pdfplumber
+        with pdfplumber.open(pdf_file_path, pages=page_numbers) as pdf:
+            if page_numbers is not None and len(pdf.pages) < len(page_numbers):
+                raise PageOutOfRangeException(self.count_pages(pdf_file_path), page_numbers[-1])
 
+            for pdf_page in pdf.pages:
+                page = self._parse_page(pdf_page)
+                # Release the characters, words and layout objects pdfplumber cached for this page
+                pdf_page.close()
+                PARSED_PAGES.inc()
+                yield page
 
-                # Handling tables
-                if tables:
-                    table = TableContent(tables)
-                    page.add_content(table)
-                    LOG.debug(f"[table]\n{table}")
+    def _parse_page(self, pdf_page) -> Page:
+        page = Page(page_number=pdf_page.page_number - 1)
 
-                book.add_page(page)
+        # Locate the tables once; their bounding boxes separate table cells from body text
+        found_tables = pdf_page.find_tables()
+        tables = [
+            [[cell if cell is not None else "" for cell in row] for row in table.extract()]
+            for table in found_tables
+        ]
+        table_bboxes = [table.bbox for table in found_tables]
 
-        return book
+        # Store the original text content, taken only from outside the table regions in a single pass
+        if table_bboxes:
+            text_page = pdf_page.filter(lambda obj: not _inside_any_bbox(obj, table_bboxes))
+        else:
+            text_page = pdf_page
+        raw_text = text_page.extract_text()
+
+        # Handling text
+        if raw_text:
+            # Remove empty lines and leading/trailing whitespaces
+            raw_text_lines = raw_text.splitlines()
+            cleaned_raw_text_lines = [line.strip() for line in raw_text_lines if line.strip()]
+            cleaned_raw_text = "\n".join(cleaned_raw_text_lines)
+
+            text_content = Content(content_type=ContentType.TEXT, original=cleaned_raw_text)
+            page.add_content(text_content)
+            LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
+
+        # Handling tables
+        for table_data in tables:
+            if not table_data:
+                continue
+            table = TableContent(table_data)
+            page.add_content(table)
+            LOG.debug(f"[table]\n{table}")
+
+        return page
+
+
+def _inside_any_bbox(obj, bboxes) -> bool:
+    # An object belongs to a table when its centre lies inside the table's bounding box
+    if "x0" not in obj or "top" not in obj:
+        return False
+    x = (obj["x0"] + obj["x1"]) / 2
+    y = (obj["top"] + obj["bottom"]) / 2
+    return any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in bboxes)
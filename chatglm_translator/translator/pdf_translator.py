@@ -1,29 +1,708 @@
-from typing import Optional
+import copy
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
+from typing import Callable, Dict, List, Optional, Tuple
+from book import Content, ContentType, Page, TableContent
 from translator.pdf_parser import PDFParser
 from translator.writer import Writer
+from translator.font_registry import FontRegistry
 from translator.translation_chain import TranslationChain
+from translator.segment_packer import SegmentPacker, PACKING_INSTRUCTION
+from translator.translation_memory import TranslationMemory
+from translator.fuzzy_match import format_examples, merge_examples, substitute_placeholders
+from translator.segment_filter import SegmentFilter, NUMERIC_PATTERN
+from translator.table_translator import (
+    CellBatch, TABLE_INSTRUCTION, build_cell_request, chunk_cells, parse_cell_response
+)
+from translator.glossary import Glossary
+from translator.boilerplate import BoilerplateDetector
+from translator.job_journal import JobJournal
+from translator.translation_job import TranslationJob
+from translator.edition_diff import PreviousEdition, REFERENCE_INSTRUCTION, summarize
+from translator.scheduler import FairScheduler
+from translator.rate_limiter import AdaptiveRateLimiter
 from utils import LOG
+from utils.metrics import SEGMENTS, CACHE_LOOKUPS, SKIPPED_SEGMENTS, TABLE_CELLS
+from utils.page_range import PageSelection, is_page_subset, page_spec_label
+
+DEFAULT_STYLE = "Please translate the following content."
 
 class PDFTranslator:
-    def __init__(self, model_name: str):
-        self.translate_chain = TranslationChain(model_name)
-        self.pdf_parser = PDFParser()
-        self.writer = Writer()
+    def __init__(self,
+                 model_name: str,
+                 max_workers: int = 1,
+                 packing_token_budget: int = 0,
+                 translation_memory: Optional[TranslationMemory] = None,
+                 parse_workers: int = 1,
+                 scheduler: Optional[FairScheduler] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 chat_model=None,
+                 verbose: bool = True,
+                 font_registry: Optional[FontRegistry] = None,
+                 render_workers: int = 1,
+                 segment_filter: Optional[SegmentFilter] = None,
+                 glossary: Optional[Glossary] = None,
+                 fuzzy_threshold: float = 0.0,
+                 boilerplate: Optional[BoilerplateDetector] = None):
+        self.translate_chain = TranslationChain(
+            model_name, verbose=verbose, rate_limiter=rate_limiter, chat_model=chat_model)
+        self.pdf_parser = PDFParser(workers=parse_workers, boilerplate=boilerplate)
+        self.writer = Writer(font_registry, render_workers=render_workers)
+        # Number of LLM requests kept in flight; 1 keeps the original sequential behaviour
+        self.max_workers = max(1, max_workers)
+        # Short text segments are packed into one request up to this many tokens; 0 disables packing
+        self.segment_packer = SegmentPacker(packing_token_budget) if packing_token_budget > 0 else None
+        # Optional disk-backed cache of finished translations, consulted before any LLM call
+        self.translation_memory = translation_memory
+        # Minimum similarity for a near-duplicate in the translation memory to be reused or shown
+        # as an example (0 disables fuzzy lookups)
+        self.fuzzy_threshold = fuzzy_threshold
+        # Optional scheduler shared with other translators in the process, interleaving their jobs fairly
+        self.scheduler = scheduler
+        # Local rules that pass page numbers, URLs, numbers, code and already translated text through
+        self.segment_filter = segment_filter
+        # Terminology whose matching entries are added to each request's prompt
+        self.glossary = glossary
+
+    @classmethod
+    def from_config(cls, config):
+        # Optional settings fall back to their defaults when absent from config.yaml and the command line
+        translation_memory = None
+        if getattr(config, "translation_memory", None):
+            translation_memory = TranslationMemory(
+                config.translation_memory,
+                max_entries=getattr(config, "translation_memory_max_entries", 100000),
+            )
+
+        scheduler = None
+        if getattr(config, "scheduler_concurrency", None):
+            scheduler = FairScheduler.shared(
+                config.scheduler_concurrency,
+                per_job_limit=getattr(config, "scheduler_per_job_limit", None),
+            )
+
+        rate_limiter = None
+        if getattr(config, "rate_limit", None):
+            rate_limiter = AdaptiveRateLimiter(
+                rate=config.rate_limit,
+                initial_concurrency=getattr(config, "max_workers", 1),
+                max_concurrency=getattr(config, "rate_limit_max_concurrency", 32),
+                max_retries=getattr(config, "rate_limit_max_retries", 5),
+            )
+
+        font_registry = None
+        if getattr(config, "fonts", None) or getattr(config, "font_path", None):
+            fonts = dict(getattr(config, "fonts", None) or {})
+            font_name = getattr(config, "font_name", None) or "SimSun"
+            if getattr(config, "font_path", None):
+                fonts[font_name] = config.font_path
+            font_registry = FontRegistry(fonts, default_font=font_name)
+
+        boilerplate_mode = getattr(config, "boilerplate", None) or "reuse"
+
+        return cls(
+            config.model_name,
+            max_workers=getattr(config, "max_workers", 1),
+            packing_token_budget=getattr(config, "packing_token_budget", 0),
+            translation_memory=translation_memory,
+            parse_workers=getattr(config, "parse_workers", 1),
+            scheduler=scheduler,
+            rate_limiter=rate_limiter,
+            font_registry=font_registry,
+            render_workers=getattr(config, "render_workers", 1),
+            segment_filter=None if getattr(config, "disable_skip_filter", False) else SegmentFilter(),
+            glossary=Glossary.load(config.glossary) if getattr(config, "glossary", None) else None,
+            fuzzy_threshold=getattr(config, "fuzzy_threshold", 0.6),
+            boilerplate=None if boilerplate_mode == "keep" else BoilerplateDetector(boilerplate_mode),
+        )
 
     def translate_pdf(self,
                     input_file: str,
                     output_file_format: str = 'markdown',
                     source_language: str = "English",
                     target_language: str = 'Chinese',
-                    pages: Optional[int] = None):
-        
-        self.book = self.pdf_parser.parse_pdf(input_file, pages)
-
-        for page_idx, page in enumerate(self.book.pages):
-            for content_idx, content in enumerate(page.contents):
-                # Translate content.original
-                translation, status = self.translate_chain.run(content, source_language, target_language)
-                # Update the content in self.book.pages directly
-                self.book.pages[page_idx].contents[content_idx].set_translation(translation, status)
+                    pages: PageSelection = None,
+                    style: str = DEFAULT_STYLE,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    resume: bool = False,
+                    weight: float = 1.0,
+                    previous_edition: Optional[str] = None,
+                    stage_callback: Optional[Callable[[str, float], None]] = None):
+        # stage_callback receives ("parse" | "translate" | "write", seconds) as each stage finishes
+        def stage_done(stage: str, started: float) -> float:
+            now = time.perf_counter()
+            if stage_callback is not None:
+                stage_callback(stage, now - started)
+            return now
+
+        # Read the earlier edition before this run's journal is opened: both may be the same file when
+        # a new edition replaces the old PDF in place
+        edition = PreviousEdition.load(previous_edition, target_language) if previous_edition else None
+        job = self._create_job(input_file, style, source_language, target_language, resume, progress_callback, weight)
+        try:
+            # Kept local so that concurrent jobs on one translator do not overwrite each other's book
+            started = time.perf_counter()
+            book = self.pdf_parser.parse_pdf(input_file, pages)
+            self.book = book
+            started = stage_done("parse", started)
+
+            for page_idx, page in enumerate(book.pages):
+                job.register_page(page.page_number if page.page_number is not None else page_idx, page)
+
+            contents = [content for page in book.pages for content in page.contents]
+            if edition is not None:
+                self._apply_previous_edition(contents, job, edition)
+            self._translate_contents(contents, job)
+            started = stage_done("translate", started)
+        finally:
+            self._close_job(job)
+
+        self._log_summary(sum(1 for content in contents if not content.status), job)
         
-        return self.writer.save_translated_book(self.book, output_file_format)
+        output_file_path = self.writer.save_translated_book(
+            book, output_file_format, self._output_file_path(input_file, output_file_format, pages))
+        stage_done("write", started)
+        return output_file_path
+
+    def translate_pdf_multi(self,
+                    input_file: str,
+                    output_file_format: str = 'markdown',
+                    source_language: str = "English",
+                    target_languages: List[str] = ('Chinese',),
+                    pages: PageSelection = None,
+                    style: str = DEFAULT_STYLE,
+                    resume: bool = False,
+                    weight: float = 1.0) -> Dict[str, str]:
+        # Parse and segment once, then translate a copy of the book into every target language.
+        # All languages share this translator's workers, scheduler and rate limiter.
+        target_languages = list(dict.fromkeys(target_languages))
+        book = self.pdf_parser.parse_pdf(input_file, pages)
+
+        books, jobs = {}, {}
+        try:
+            for target_language in target_languages:
+                books[target_language] = copy.deepcopy(book)
+                jobs[target_language] = self._create_job(
+                    input_file, style, source_language, target_language, resume, weight=weight)
+                for page_idx, page in enumerate(books[target_language].pages):
+                    jobs[target_language].register_page(
+                        page.page_number if page.page_number is not None else page_idx, page)
+
+            self._translate_jobs([
+                ([content for page in books[language].pages for content in page.contents], jobs[language])
+                for language in target_languages
+            ])
+        finally:
+            for job in jobs.values():
+                self._close_job(job)
+
+        output_files = {}
+        for target_language in target_languages:
+            translated_book = books[target_language]
+            failed = sum(1 for page in translated_book.pages for content in page.contents if not content.status)
+            LOG.info(f"[{target_language}] 翻译结束")
+            self._log_summary(failed, jobs[target_language])
+            output_files[target_language] = self.writer.save_translated_book(
+                translated_book, output_file_format,
+                self._output_file_path(input_file, output_file_format, pages, target_language))
+
+        return output_files
+
+    def translate_pdf_stream(self,
+                    input_file: str,
+                    output_file_format: str = 'markdown',
+                    source_language: str = "English",
+                    target_language: str = 'Chinese',
+                    pages: PageSelection = None,
+                    style: str = DEFAULT_STYLE,
+                    window: Optional[int] = None,
+                    page_callback: Optional[Callable[[int, Page], None]] = None,
+                    resume: bool = False,
+                    weight: float = 1.0):
+        # Pages are parsed lazily, translated as they arrive and appended to the output in order.
+        # At most `window` pages are held in memory at any time.
+        window = max(1, window or self.max_workers * 2)
+        job = self._create_job(input_file, style, source_language, target_language, resume, weight=weight)
+        stream = self.writer.open_book_stream(
+            input_file, output_file_format, self._output_file_path(input_file, output_file_format, pages))
+        in_flight = deque()
+        pages_written = 0
+        failed = 0
+
+        def flush_oldest():
+            nonlocal pages_written, failed
+            page, futures = in_flight.popleft()
+            for future in futures:
+                future.result()
+            stream.write_page(page)
+            failed += sum(1 for content in page.contents if not content.status)
+            LOG.info(f"已完成第 {pages_written + 1} 页")
+            if page_callback is not None:
+                page_callback(pages_written, page)
+            pages_written += 1
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        completed = False
+        try:
+            for page_idx, page in enumerate(self.pdf_parser.iter_pages(input_file, pages)):
+                job.register_page(page.page_number if page.page_number is not None else page_idx, page)
+                batches = self._prepare_batches(page.contents, job)
+                futures = [executor.submit(self._translate_batch, batch, job) for batch in batches]
+                in_flight.append((page, futures))
+
+                while len(in_flight) >= window:
+                    flush_oldest()
+
+            while in_flight:
+                flush_oldest()
+            completed = True
+        finally:
+            # Drop queued requests if the pipeline failed part-way; the journal keeps the finished
+            # segments for --resume while the partial output is thrown away
+            executor.shutdown(wait=True, cancel_futures=True)
+            if not completed:
+                stream.abort()
+            self._close_job(job)
+
+        output_file_path = stream.close()
+
+        self._log_summary(failed, job)
+
+        return output_file_path
+
+    def _output_file_path(self,
+                          input_file: str,
+                          output_file_format: str,
+                          pages: PageSelection,
+                          target_language: Optional[str] = None) -> Optional[str]:
+        # A page range or a language of a multi-language job gets its own output file
+        # instead of overwriting the whole book's translation
+        if not is_page_subset(pages) and target_language is None:
+            return None
+        suffix = "_translated"
+        if target_language is not None:
+            suffix += "_" + "_".join(target_language.split())
+        if is_page_subset(pages):
+            suffix += f"_pages_{page_spec_label(pages)}"
+        extension = "pdf" if output_file_format.lower() == "pdf" else "md"
+        return input_file.replace('.pdf', f'{suffix}.{extension}')
+
+    def _create_job(self,
+                    input_file: str,
+                    style: str,
+                    source_language: str,
+                    target_language: str,
+                    resume: bool = False,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    weight: float = 1.0) -> TranslationJob:
+        # Every job keeps a journal of finished segments so that an interrupted run can be resumed
+        journal = JobJournal(JobJournal.path_for(input_file, target_language), resume=resume)
+        job = TranslationJob(input_file, style, source_language, target_language, journal, progress_callback, weight)
+        if self.scheduler is not None:
+            self.scheduler.register(job.job_id, weight)
+        return job
+
+    def _close_job(self, job: TranslationJob):
+        job.close()
+        if self.scheduler is not None:
+            self.scheduler.unregister(job.job_id)
+
+    def _apply_previous_edition(self, contents: List[Content], job: TranslationJob, edition: PreviousEdition):
+        # Diff mode: reuse the earlier edition's translations for unchanged segments and
+        # give edited ones the earlier translation as a reference
+        keys = [self._content_key(content, job) for content in contents]
+        matches = edition.align([str(content) for content in contents], keys)
+
+        for content, key, match in zip(contents, keys, matches):
+            if match is None:
+                continue
+            if match.kind == "fuzzy":
+                job.references[job.locate(content)] = (match.source, match.translation)
+                continue
+            content.set_translation(match.translation, True)
+            if content.status and job.journal is not None:
+                page_idx, content_idx = job.locate(content)
+                job.journal.record(page_idx, content_idx, key, match.translation, True, str(content))
+
+        exact, fuzzy, new = summarize(matches)
+        LOG.info(f"版本比对: {exact} 个片段未变化，{fuzzy} 个片段有修改，{new} 个片段为新增")
+
+    def _translate_contents(self, contents: List[Content], job: TranslationJob):
+        self._translate_jobs([(contents, job)])
+
+    def _translate_jobs(self, work: List[Tuple[List[Content], TranslationJob]]):
+        totals, done, queues = {}, {}, []
+        for contents, job in work:
+            batches = self._prepare_batches(contents, job)
+            totals[job.job_id] = len(contents)
+            done[job.job_id] = len(contents) - sum(self._progress_units(batch) for batch in batches)
+            if done[job.job_id]:
+                self._report_progress(done[job.job_id], totals[job.job_id], job)
+            queues.append([(batch, job) for batch in batches])
+
+        # Interleave the jobs' batches so that several target languages advance together
+        requests = [request for group in zip_longest(*queues) for request in group if request is not None]
+
+        def finish(batch: List[Content], job: TranslationJob):
+            done[job.job_id] += self._progress_units(batch)
+            self._report_progress(done[job.job_id], totals[job.job_id], job)
+
+        if self.max_workers == 1 or len(requests) <= 1:
+            for batch, job in requests:
+                self._translate_batch(batch, job)
+                finish(batch, job)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Each future is bound to its own Contents, so results land in the right place
+            # regardless of the order in which the requests complete.
+            futures = {executor.submit(self._translate_batch, batch, job): (batch, job) for batch, job in requests}
+            for future in as_completed(futures):
+                future.result()
+                finish(*futures[future])
+
+    @staticmethod
+    def _progress_units(batch) -> int:
+        # Progress is counted in segments; a cell request counts the tables it completes
+        return batch.progress_units if isinstance(batch, CellBatch) else len(batch)
+
+    def _prepare_batches(self, contents: List[Content], job: TranslationJob) -> List[List[Content]]:
+        # Resolve what is already known locally, then group the rest into LLM requests
+        contents = [
+            content for content in contents
+            if not self._apply_skip_filter(content, job)
+            and not self._apply_known_translation(content, job)
+            and not self._apply_boilerplate(content, job)
+        ]
+
+        # Tables are translated cell by cell through a per-book dictionary of unique cell strings
+        tables = [content for content in contents if content.content_type == ContentType.TABLE]
+        contents = [content for content in contents if content.content_type != ContentType.TABLE]
+        cell_batches = self._prepare_table_batches(tables, job)
+
+        # Segments carrying an earlier edition's translation as reference are sent on their own
+        referenced = [[content] for content in contents if job.locate(content) in job.references]
+        contents = [content for content in contents if job.locate(content) not in job.references]
+
+        if self.segment_packer is not None:
+            batches = self.segment_packer.pack(contents)
+            LOG.debug(f"{len(contents)} 个片段打包为 {len(batches)} 个请求")
+            return batches + referenced + cell_batches
+
+        return [[content] for content in contents] + referenced + cell_batches
+
+    def _prepare_table_batches(self, tables: List[TableContent], job: TranslationJob) -> List[CellBatch]:
+        new_cells, waiting = [], []
+        for table in tables:
+            cells = self._cells_to_translate(table, job)
+            skipped = len({cell for cell in table.original if cell.strip()}) - len(cells)
+            if skipped:
+                job.skipped_cells += skipped
+                SKIPPED_SEGMENTS.inc(skipped, reason="table_cell")
+            if self.translation_memory is not None:
+                self._apply_known_cells(cells, job)
+            claimed, missing = job.table_cells.register(table, cells)
+            TABLE_CELLS.inc(len(cells) - len(claimed), source="book")
+            new_cells.extend(claimed)
+            if missing:
+                waiting.append((table, missing))
+            else:
+                self._finish_table(table, job)
+
+        batches = chunk_cells(new_cells)
+        # Each table counts towards progress when the last request holding one of its cells finishes
+        batch_of_cell = {cell: index for index, batch in enumerate(batches) for cell in batch.cells}
+        for table, missing in waiting:
+            owners = [batch_of_cell[cell] for cell in missing if cell in batch_of_cell]
+            if owners:
+                batches[max(owners)].progress_units += 1
+        if new_cells:
+            LOG.debug(f"{len(tables)} 个表格中的 {len(new_cells)} 个新单元格分为 {len(batches)} 个请求")
+        return batches
+
+    def _cells_to_translate(self, table: TableContent, job: TranslationJob) -> List[str]:
+        # Empty, numeric and otherwise skippable cells are kept as they are
+        cells = []
+        for cell in dict.fromkeys(table.original):
+            if not cell.strip():
+                continue
+            if self.segment_filter is not None:
+                if self.segment_filter.skip_reason(cell, job.source_language, job.target_language) is not None:
+                    continue
+            elif NUMERIC_PATTERN.match(cell):
+                continue
+            cells.append(cell)
+        return cells
+
+    def _apply_known_cells(self, cells: List[str], job: TranslationJob):
+        known = {}
+        for cell in cells:
+            if job.table_cells.is_known(cell):
+                continue
+            translation = self.translation_memory.get(self._cell_key(cell, job))
+            CACHE_LOOKUPS.inc(source="memory", result="miss" if translation is None else "hit")
+            if translation is not None:
+                known[cell] = translation
+        if known:
+            TABLE_CELLS.inc(len(known), source="memory")
+            for table in job.table_cells.resolve(known):
+                self._finish_table(table, job)
+
+    def _translate_cells(self, batch: CellBatch, job: TranslationJob):
+        results = dict(zip(batch.cells, self._request_cells(batch.cells, job)))
+        for cell, text in results.items():
+            TABLE_CELLS.inc(source="llm" if text is not None else "failed")
+            if text is not None and self.translation_memory is not None:
+                self.translation_memory.put(self._cell_key(cell, job), text)
+        for table in job.table_cells.resolve(results):
+            self._finish_table(table, job)
+
+    def _request_cells(self, cells: List[str], job: TranslationJob) -> List[Optional[str]]:
+        # A single cell is plain text; None marks a cell that could not be translated
+        if len(cells) == 1:
+            text, ok = self._run_chain(cells[0], self._style_for(cells[0], job), job)
+            return [text.strip() if ok and text.strip() else None]
+
+        request = build_cell_request(cells)
+        style = self._style_for(request, job) + f"\n{TABLE_INSTRUCTION}"
+        translation, status = self._run_chain(request, style, job)
+        if not status:
+            # The chain already retried; smaller requests would fail the same way, so leave it to --resume
+            return [None] * len(cells)
+        translations = parse_cell_response(translation, len(cells))
+        if translations is not None:
+            return translations
+
+        # Halve the request rather than fall back to one call per cell, so that a single unparsable
+        # answer costs a few extra calls instead of up to MAX_CELLS_PER_REQUEST
+        LOG.warning(f"表格单元格翻译结果无法解析，拆分为两个请求重试 ({len(cells)} 个单元格)")
+        middle = len(cells) // 2
+        return self._request_cells(cells[:middle], job) + self._request_cells(cells[middle:], job)
+
+    def _finish_table(self, table: TableContent, job: TranslationJob):
+        # Scatter the cell translations back into the grid; cells that failed keep their original text
+        # and leave the table unfinished so that --resume retries it
+        needed = set(self._cells_to_translate(table, job))
+        rows, status = [], True
+        for row in table.rows():
+            translated_row = []
+            for cell in row:
+                translation = job.table_cells.translation(cell) if cell in needed else cell
+                if translation is None:
+                    translation, status = cell, False
+                translated_row.append(translation)
+            rows.append(translated_row)
+        self._finish_content(table, json.dumps(rows, ensure_ascii=False), status, job)
+
+    def _cell_key(self, cell: str, job: TranslationJob) -> str:
+        return TranslationMemory.make_key(
+            cell, f"{job.style}\n{TABLE_INSTRUCTION}", job.source_language, job.target_language,
+            self.translate_chain.model_name)
+
+    def _translate_batch(self, batch: List[Content], job: TranslationJob):
+        if isinstance(batch, CellBatch):
+            self._translate_cells(batch, job)
+            return
+        if len(batch) == 1:
+            self._translate_content(batch[0], job)
+            return
+
+        request = self.segment_packer.build_request(batch)
+        packed_style = self._style_for(request, job)
+        # Few-shot examples of the packed segments are merged into the one request
+        examples = merge_examples([job.examples.get(job.locate(content), []) for content in batch])
+        if examples:
+            packed_style += "\n" + format_examples(examples)
+        packed_style += f"\n{PACKING_INSTRUCTION}"
+        translation, status = self._run_chain(request, packed_style, job)
+
+        segments = self.segment_packer.split_response(translation, len(batch)) if status else None
+        if segments is None:
+            LOG.warning(f"打包翻译结果无法对齐，回退为逐段翻译 ({len(batch)} 个片段)")
+            for content in batch:
+                self._translate_content(content, job)
+            return
+
+        for content, segment in zip(batch, segments):
+            self._finish_content(content, segment, True, job)
+
+    def _translate_content(self, content: Content, job: TranslationJob):
+        # Translate content.original
+        translation, status = self._run_chain(str(content), self._content_style(content, job), job)
+        self._finish_content(content, translation, status, job)
+
+    def _content_style(self, content: Content, job: TranslationJob) -> str:
+        style = self._style_for(str(content), job)
+        position = job.locate(content)
+        reference = job.references.get(position)
+        if reference is not None:
+            style = f"{style}\n" + REFERENCE_INSTRUCTION.format(source=reference[0], translation=reference[1])
+        examples = job.examples.get(position)
+        if examples:
+            style = f"{style}\n" + format_examples(examples)
+        return style
+
+    def _style_for(self, text: str, job: TranslationJob) -> str:
+        if self.glossary is None:
+            return job.style
+        instruction = self.glossary.instruction_for(text, job.target_language)
+        return f"{job.style}\n{instruction}" if instruction else job.style
+
+    def _run_chain(self, text: str, style: str, job: TranslationJob):
+        if self.scheduler is None:
+            return self.translate_chain.run(text, style, job.source_language, job.target_language)
+        # Wait for a fair share of the process-wide request slots before calling the LLM
+        return self.scheduler.run(
+            job.job_id, self.translate_chain.run, text, style, job.source_language, job.target_language)
+
+    def _finish_content(self, content: Content, translation: str, status: bool, job: TranslationJob):
+        self._record_translation(content, translation, status, job)
+        if content.boilerplate:
+            self._resolve_boilerplate(content, translation, job)
+
+    def _record_translation(self, content: Content, translation: str, status: bool, job: TranslationJob):
+        # Update the content in self.book.pages directly
+        content.set_translation(translation, status)
+        SEGMENTS.inc(status="ok" if content.status else "failed")
+        # Tables may still fail while parsing the answer, so the content's own status decides what is kept
+        key = self._content_key(content, job)
+        if content.status and self.translation_memory is not None:
+            self._remember(content, key, translation, job)
+        page_idx, content_idx = job.locate(content)
+        job.references.pop((page_idx, content_idx), None)
+        job.examples.pop((page_idx, content_idx), None)
+        if job.journal is not None:
+            job.journal.record(page_idx, content_idx, key, translation, content.status, str(content))
+
+    def _resolve_boilerplate(self, leader: Content, translation: str, job: TranslationJob):
+        # When a header or footer fails, its first waiting repeat takes over as the leader and is sent next,
+        # once, while the other repeats keep waiting on it. This runs in the failed leader's request so that
+        # every repeat is finished before the leader's page is written out.
+        while leader is not None:
+            leader = job.boilerplate.resolve(
+                leader, translation, leader.status,
+                lambda follower, adapted: self._finish_boilerplate(follower, adapted, job))
+            if leader is not None:
+                translation, status = self._run_chain(str(leader), self._content_style(leader, job), job)
+                self._record_translation(leader, translation, status, job)
+
+    def _content_key(self, content: Content, job: TranslationJob) -> str:
+        # The matched glossary entries are part of the key, so editing a term invalidates only segments using it
+        return TranslationMemory.make_key(
+            str(content), self._style_for(str(content), job), job.source_language, job.target_language,
+            self.translate_chain.model_name
+        )
+
+    def _apply_skip_filter(self, content: Content, job: TranslationJob) -> bool:
+        if self.segment_filter is None:
+            return False
+        reason = self.segment_filter.skip_reason_for_content(content, job.source_language, job.target_language)
+        if reason is None:
+            return False
+
+        # Pass the original through as its own translation
+        if content.content_type == ContentType.TABLE:
+            content.set_translated_rows(content.rows(), True)
+        else:
+            content.set_translation(str(content), True)
+        job.skipped += 1
+        SKIPPED_SEGMENTS.inc(reason=reason)
+        LOG.debug(f"[skip:{reason}] {str(content)[:80]}")
+        return True
+
+    def _apply_boilerplate(self, content: Content, job: TranslationJob) -> bool:
+        # Repeats of a header or footer wait for (or reuse) the translation of its first occurrence
+        if not content.boilerplate:
+            return False
+        handled, translation = job.boilerplate.claim(content)
+        if translation is not None:
+            self._finish_content(content, translation, True, job)
+        return handled
+
+    def _finish_boilerplate(self, content: Content, translation: Optional[str], job: TranslationJob):
+        if translation is None:
+            self._translate_content(content, job)
+        else:
+            self._finish_content(content, translation, True, job)
+
+    def _apply_known_translation(self, content: Content, job: TranslationJob) -> bool:
+        key = self._content_key(content, job)
+        page_idx, content_idx = job.locate(content)
+
+        if job.journal is not None:
+            translation = job.journal.lookup(page_idx, content_idx, key)
+            CACHE_LOOKUPS.inc(source="journal", result="miss" if translation is None else "hit")
+            if translation is not None:
+                content.set_translation(translation, True)
+                if content.status:
+                    SEGMENTS.inc(status="cached")
+                    return True
+
+        if self.translation_memory is not None:
+            translation = self.translation_memory.get(key)
+            CACHE_LOOKUPS.inc(source="memory", result="miss" if translation is None else "hit")
+            if translation is not None:
+                content.set_translation(translation, True)
+                if content.status:
+                    SEGMENTS.inc(status="cached")
+                    if job.journal is not None:
+                        job.journal.record(page_idx, content_idx, key, translation, True, str(content))
+                    return True
+
+            if self.fuzzy_threshold and content.content_type == ContentType.TEXT:
+                return self._apply_fuzzy_match(content, key, job)
+
+        return False
+
+    def _apply_fuzzy_match(self, content: Content, key: str, job: TranslationJob) -> bool:
+        # A near-duplicate differing only in numbers, codes or names is reused with those values swapped in;
+        # otherwise the closest matches guide the LLM as few-shot examples
+        matches = self.translation_memory.find_similar(str(content), self._memory_scope(job), self.fuzzy_threshold)
+        for match in matches:
+            translation = substitute_placeholders(match.source, match.translation, str(content))
+            if translation is None:
+                continue
+            content.set_translation(translation, True)
+            if content.status:
+                CACHE_LOOKUPS.inc(source="fuzzy", result="hit")
+                SEGMENTS.inc(status="cached")
+                self._remember(content, key, translation, job)
+                if job.journal is not None:
+                    page_idx, content_idx = job.locate(content)
+                    job.journal.record(page_idx, content_idx, key, translation, True, str(content))
+                return True
+
+        CACHE_LOOKUPS.inc(source="fuzzy", result="example" if matches else "miss")
+        if matches:
+            job.examples[job.locate(content)] = matches
+        return False
+
+    def _remember(self, content: Content, key: str, translation: str, job: TranslationJob):
+        # Text segments are also indexed for fuzzy lookups; table answers are not reusable piecewise
+        if self.fuzzy_threshold and content.content_type == ContentType.TEXT:
+            self.translation_memory.put(key, translation, source=str(content), scope=self._memory_scope(job))
+        else:
+            self.translation_memory.put(key, translation)
+
+    def _memory_scope(self, job: TranslationJob) -> str:
+        # Fuzzy matches are only shared between jobs with the same style, languages and model
+        return TranslationMemory.make_key(
+            "", job.style, job.source_language, job.target_language, self.translate_chain.model_name)[:16]
+
+    def _log_summary(self, failed: int, job: TranslationJob):
+        if job.skipped or job.skipped_cells:
+            LOG.info(f"跳过 {job.skipped} 个无需翻译的片段和 {job.skipped_cells} 个表格单元格")
+        if failed:
+            LOG.warning(f"{failed} 个片段翻译失败，可使用 --resume 重新翻译失败的片段")
+        if self.translation_memory is not None:
+            LOG.info(f"翻译记忆统计: {self.translation_memory.stats()}")
+        if self.translate_chain.rate_limiter is not None:
+            LOG.info(f"限流统计: {self.translate_chain.rate_limiter.stats()}")
+
+    def _report_progress(self, done: int, total: int, job: TranslationJob):
+        LOG.info(f"翻译进度 [{job.target_language}]: {done}/{total}")
+        if job.progress_callback is not None:
+            job.progress_callback(done, total)
@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+from utils import LOG
+from utils.metrics import LLM_EFFECTIVE_RATE, LLM_RETRIES
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AdaptiveRateLimiter:
+    # Token bucket for the request rate plus an AIMD concurrency limit: the limit grows slowly
+    # while requests succeed and is halved on rate-limit errors or timeouts.
+    def __init__(self,
+                 rate: float = 5.0,
+                 burst: Optional[int] = None,
+                 initial_concurrency: int = 4,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 32,
+                 max_retries: int = 5,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._bucket_lock = threading.Lock()
+
+        self._concurrency_limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+        self._completed = deque()
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+        LLM_EFFECTIVE_RATE.set_function(self.effective_rate)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._release()
+                retryable = is_retryable(e) and attempt < self.max_retries
+                self._on_error(retryable)
+                if not retryable:
+                    raise
+                delay = self._backoff_delay(attempt, retry_after(e))
+                attempt += 1
+                LOG.warning(f"请求被限流或超时，{delay:.1f} 秒后进行第 {attempt} 次重试: {e}")
+                time.sleep(delay)
+                continue
+
+            self._release()
+            self._on_success()
+            return result
+
+    def _acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._concurrency_limit):
+                self._condition.wait()
+            self._in_flight += 1
+            self.requests += 1
+        self._take_token()
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _take_token(self):
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def _on_success(self):
+        with self._condition:
+            self.successes += 1
+            self._completed.append(time.monotonic())
+            # Additive increase: roughly one extra slot per `limit` successful requests
+            self._concurrency_limit = min(self.max_concurrency, self._concurrency_limit + 1.0 / self._concurrency_limit)
+            self._condition.notify_all()
+
+    def _on_error(self, retryable: bool):
+        with self._condition:
+            if not retryable:
+                self.failures += 1
+                return
+            self.throttled += 1
+            self.retries += 1
+            LLM_RETRIES.inc()
+            # Multiplicative decrease
+            self._concurrency_limit = max(self.min_concurrency, self._concurrency_limit / 2)
+
+    def _backoff_delay(self, attempt: int, retry_after_seconds: Optional[float]) -> float:
+        if retry_after_seconds is not None:
+            return min(self.max_delay, retry_after_seconds)
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def effective_rate(self, window: float = 60.0) -> float:
+        with self._condition:
+            cutoff = time.monotonic() - window
+            while self._completed and self._completed[0] < cutoff:
+                self._completed.popleft()
+            return len(self._completed) / window
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+            "concurrency_limit": int(self._concurrency_limit),
+            "effective_rate": round(self.effective_rate(), 3),
+        }
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, TimeoutError) or _status_code(exc) in RETRYABLE_STATUS_CODES:
+        return True
+    # The ZhipuAI and OpenAI SDKs use their own exception classes for these cases
+    name = type(exc).__name__
+    return "RateLimit" in name or "ReachLimit" in name or "Timeout" in name or "429" in str(exc)
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,103 @@
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+class _JobQueue:
+    def __init__(self, weight: float, virtual_time: float):
+        self.weight = weight
+        # Weighted service received so far; the job with the smallest value is served next
+        self.virtual_time = virtual_time
+        self.in_flight = 0
+        self.waiters = deque()
+
+
+class FairScheduler:
+    # Shares a fixed number of LLM request slots between jobs using weighted fair queueing,
+    # so a large book cannot starve the small jobs submitted after it.
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = 8, per_job_limit: Optional[int] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_job_limit = per_job_limit
+        self._condition = threading.Condition()
+        self._jobs = {}
+        self._in_flight = 0
+        self._tickets = itertools.count()
+
+    @classmethod
+    def shared(cls, max_concurrency: int = 8, per_job_limit: Optional[int] = None) -> "FairScheduler":
+        # One scheduler per process, shared by every PDFTranslator built from the config
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_concurrency, per_job_limit)
+            return cls._shared
+
+    def register(self, job_id: str, weight: float = 1.0):
+        with self._condition:
+            # A new job starts level with the least served active job instead of at zero,
+            # otherwise it would monopolize the slots until it caught up.
+            start = min((queue.virtual_time for queue in self._jobs.values()), default=0.0)
+            self._jobs[job_id] = _JobQueue(max(weight, 1e-6), start)
+
+    def unregister(self, job_id: str):
+        with self._condition:
+            self._jobs.pop(job_id, None)
+            self._condition.notify_all()
+
+    def run(self, job_id: str, fn: Callable, *args, **kwargs):
+        self._acquire(job_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._release(job_id)
+
+    def _acquire(self, job_id: str):
+        with self._condition:
+            if job_id not in self._jobs:
+                self._jobs[job_id] = _JobQueue(1.0, 0.0)
+            queue = self._jobs[job_id]
+            ticket = next(self._tickets)
+            queue.waiters.append(ticket)
+            while self._next_ticket() != ticket:
+                self._condition.wait()
+            queue.waiters.popleft()
+            queue.in_flight += 1
+            queue.virtual_time += 1.0 / queue.weight
+            self._in_flight += 1
+            # Another slot may still be free for a different job
+            self._condition.notify_all()
+
+    def _release(self, job_id: str):
+        with self._condition:
+            self._in_flight -= 1
+            queue = self._jobs.get(job_id)
+            if queue is not None:
+                queue.in_flight -= 1
+            self._condition.notify_all()
+
+    def _next_ticket(self) -> Optional[int]:
+        if self._in_flight >= self.max_concurrency:
+            return None
+
+        candidates = [
+            queue for queue in self._jobs.values()
+            if queue.waiters and (self.per_job_limit is None or queue.in_flight < self.per_job_limit)
+        ]
+        if not candidates:
+            return None
+
+        queue = min(candidates, key=lambda candidate: (candidate.virtual_time, candidate.waiters[0]))
+        return queue.waiters[0]
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "jobs": {
+                    job_id: {"in_flight": queue.in_flight, "waiting": len(queue.waiters)}
+                    for job_id, queue in self._jobs.items()
+                },
+            }
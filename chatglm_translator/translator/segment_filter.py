@@ -0,0 +1,103 @@
+import re
+from typing import Optional
+from book import Content, ContentType
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(page|p\.|第)?\s*\d+\s*((/|of)\s*\d+)?\s*(页)?$", re.IGNORECASE)
+ROMAN_PAGE_NUMBER_PATTERN = re.compile(r"^(?=[ivxlc]+$|[IVXLC]+$)(x{0,3}|X{0,3})(ix|iv|v?i{0,3}|IX|IV|V?I{0,3})$")
+URL_PATTERN = re.compile(r"^((https?|ftp)://|www\.)\S+$|^[\w.+-]+@[\w-]+(\.[\w-]+)+$", re.IGNORECASE)
+NUMERIC_PATTERN = re.compile(r"^[\s\d.,:;%+\-–—/()\[\]$€£¥#×*=<>~±°]*\d[\s\d.,:;%+\-–—/()\[\]$€£¥#×*=<>~±°]*$")
+CODE_LINE_PATTERN = re.compile(
+    r"^\s*(def |class |import |from \S+ import |#include|return\b|public |private |function\b|var |const |let )"
+    r"|[;{}]\s*$|^\s*[}\])]+;?\s*$|^\s*(//|/\*|\*/)"
+)
+
+# Script that text written in a language is expected to use
+LANGUAGE_SCRIPTS = {
+    "chinese": "han", "中文": "han",
+    "japanese": "kana", "日文": "kana",
+    "korean": "hangul", "韩文": "hangul",
+    "russian": "cyrillic", "ukrainian": "cyrillic",
+    "english": "latin", "french": "latin", "german": "latin", "spanish": "latin",
+    "italian": "latin", "portuguese": "latin", "dutch": "latin", "英文": "latin",
+}
+
+CJK_SCRIPTS = ("han", "kana", "hangul")
+
+
+def _script_of(char: str) -> Optional[str]:
+    if '\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf':
+        return "han"
+    if '\u3040' <= char <= '\u30ff':
+        return "kana"
+    if '\uac00' <= char <= '\ud7af' or '\u1100' <= char <= '\u11ff':
+        return "hangul"
+    if '\u0400' <= char <= '\u04ff':
+        return "cyrillic"
+    if char.isalpha() and (char.isascii() or '\u00c0' <= char <= '\u024f'):
+        return "latin"
+    return None
+
+
+def dominant_script(text: str) -> Optional[str]:
+    counts = {}
+    for char in text:
+        script = _script_of(char)
+        if script is not None:
+            counts[script] = counts.get(script, 0) + 1
+    if not counts:
+        return None
+    # Japanese text mixes kana with kanji, so any noticeable share of kana marks it as Japanese
+    if counts.get("kana", 0) * 5 >= sum(counts.values()):
+        return "kana"
+    script, count = max(counts.items(), key=lambda item: item[1])
+    return script if count * 10 >= sum(counts.values()) * 9 else None
+
+
+class SegmentFilter:
+    # Cheap local rules for segments that need no LLM call: page numbers, URLs, numbers,
+    # code and text that is already written in the target language.
+    def __init__(self, min_letters: int = 2):
+        self.min_letters = min_letters
+
+    def skip_reason(self, text: str, source_language: str, target_language: str) -> Optional[str]:
+        stripped = text.strip()
+        if not stripped:
+            return "empty"
+        if PAGE_NUMBER_PATTERN.match(stripped) or ROMAN_PAGE_NUMBER_PATTERN.match(stripped):
+            return "page_number"
+        if URL_PATTERN.match(stripped):
+            return "url"
+        if NUMERIC_PATTERN.match(stripped):
+            return "numeric"
+        if self._letter_count(stripped) < self.min_letters:
+            return "symbols"
+
+        lines = [line for line in stripped.splitlines() if line.strip()]
+        if len(lines) >= 2 and sum(1 for line in lines if CODE_LINE_PATTERN.search(line)) * 10 >= len(lines) * 6:
+            return "code"
+
+        target_script = LANGUAGE_SCRIPTS.get(target_language.strip().lower())
+        source_script = LANGUAGE_SCRIPTS.get(source_language.strip().lower())
+        # Script detection can only tell languages apart when source and target are written differently
+        if target_script is not None and target_script != source_script and dominant_script(stripped) == target_script:
+            return "target_language"
+
+        return None
+
+    def _letter_count(self, text: str) -> int:
+        # A single CJK character is a whole word (是, 否, 年), so it already meets the letter minimum
+        return sum(
+            self.min_letters if _script_of(char) in CJK_SCRIPTS else 1
+            for char in text if char.isalpha()
+        )
+
+    def skip_reason_for_content(self, content: Content, source_language: str, target_language: str) -> Optional[str]:
+        if content.content_type == ContentType.TABLE:
+            # Tables are checked cell by cell and only skipped when no cell needs translating
+            for cell in set(content.original):
+                if self.skip_reason(cell, source_language, target_language) is None:
+                    return None
+            return "table"
+        if content.content_type == ContentType.TEXT:
+            return self.skip_reason(str(content), source_language, target_language)
+        return None
@@ -0,0 +1,73 @@
+import re
+from typing import List, Optional
+from book import Content, ContentType
+
+SEGMENT_MARKER = "<<<SEGMENT {index}>>>"
+SEGMENT_MARKER_PATTERN = re.compile(r"^\s*<<<\s*SEGMENT\s+(\d+)\s*>>>\s*$", re.MULTILINE)
+
+PACKING_INSTRUCTION = (
+    "The text consists of several segments, each introduced by a marker line such as "
+    "<<<SEGMENT 0>>>. Translate every segment on its own and copy every marker line "
+    "unchanged, in the same order. Do not add anything else."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # A rough estimate that works without a tokenizer: CJK characters are about one
+    # token each, everything else about four characters per token.
+    cjk = sum(1 for char in text if '\u3000' <= char <= '\u9fff' or '\uac00' <= char <= '\ud7af')
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+class SegmentPacker:
+    def __init__(self, token_budget: int = 1500):
+        self.token_budget = token_budget
+
+    def pack(self, contents: List[Content]) -> List[List[Content]]:
+        batches = []
+        current = []
+        current_tokens = 0
+
+        for content in contents:
+            # Tables have their own output format, so they always go on their own
+            if content.content_type != ContentType.TEXT:
+                batches.append([content])
+                continue
+
+            tokens = estimate_tokens(str(content))
+            if tokens >= self.token_budget:
+                batches.append([content])
+                continue
+
+            if current and current_tokens + tokens > self.token_budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(content)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    def build_request(self, batch: List[Content]) -> str:
+        return "\n".join(
+            f"{SEGMENT_MARKER.format(index=index)}\n{content}" for index, content in enumerate(batch)
+        )
+
+    def split_response(self, response: str, expected: int) -> Optional[List[str]]:
+        markers = list(SEGMENT_MARKER_PATTERN.finditer(response))
+        # The answer can only be aligned if every marker came back exactly once, in order
+        if [int(marker.group(1)) for marker in markers] != list(range(expected)):
+            return None
+
+        segments = []
+        for index, marker in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(response)
+            segment = response[marker.end():end].strip()
+            if not segment:
+                return None
+            segments.append(segment)
+
+        return segments
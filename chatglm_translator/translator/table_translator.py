@@ -0,0 +1,112 @@
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+from book import TableContent
+from translator.segment_packer import estimate_tokens
+
+TABLE_INSTRUCTION = (
+    "The text is a JSON array of table cells. Translate every string on its own and answer with a JSON array "
+    "of the same length and order containing only the translated strings. Do not add anything else."
+)
+
+# Limits for the unique cells sent in one request
+MAX_CELLS_PER_REQUEST = 100
+MAX_TOKENS_PER_REQUEST = 1500
+
+
+class CellBatch:
+    # Unique cell strings translated together in one JSON request
+    __slots__ = ("cells", "progress_units")
+
+    def __init__(self, cells: List[str]):
+        self.cells = cells
+        # Tables completed by this request, so that progress is still counted in segments
+        self.progress_units = 0
+
+
+def chunk_cells(cells: List[str]) -> List[CellBatch]:
+    batches = []
+    current, current_tokens = [], 0
+    for cell in cells:
+        tokens = estimate_tokens(cell)
+        if current and (len(current) >= MAX_CELLS_PER_REQUEST or current_tokens + tokens > MAX_TOKENS_PER_REQUEST):
+            batches.append(CellBatch(current))
+            current, current_tokens = [], 0
+        current.append(cell)
+        current_tokens += tokens
+    if current:
+        batches.append(CellBatch(current))
+    return batches
+
+
+def build_cell_request(cells: List[str]) -> str:
+    return json.dumps(cells, ensure_ascii=False)
+
+
+def parse_cell_response(response: str, expected: int) -> Optional[List[str]]:
+    # Models sometimes wrap the array in a code fence or a sentence; only the outermost array is read
+    start, end = response.find("["), response.rfind("]")
+    if start < 0 or end < start:
+        return None
+    try:
+        cells = json.loads(response[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(cells, list) or len(cells) != expected:
+        return None
+    if any(not isinstance(cell, (str, int, float)) or isinstance(cell, bool) for cell in cells):
+        return None
+    return [str(cell).strip() for cell in cells]
+
+
+class TableCellIndex:
+    # Translations of the unique cell strings of every table in one job. Each string is requested once;
+    # tables wait until all of their cells are known and are then filled in.
+    def __init__(self):
+        self._lock = threading.Lock()
+        # cell -> translation, None when it could not be translated
+        self._translations: Dict[str, Optional[str]] = {}
+        self._claimed: Set[str] = set()
+        # id(table) -> (table, cells it still waits for)
+        self._waiting: Dict[int, tuple] = {}
+        self._tables_by_cell: Dict[str, List[int]] = {}
+
+    def is_known(self, cell: str) -> bool:
+        with self._lock:
+            return cell in self._translations or cell in self._claimed
+
+    def translation(self, cell: str) -> Optional[str]:
+        with self._lock:
+            return self._translations.get(cell)
+
+    def register(self, table: TableContent, cells: Iterable[str]):
+        # Returns the cells nobody has requested yet (the caller translates them) and the cells the table
+        # waits for; no waiting cells means the table can be filled in right away
+        new_cells, missing = [], set()
+        with self._lock:
+            for cell in cells:
+                if cell in self._translations:
+                    continue
+                missing.add(cell)
+                if cell not in self._claimed:
+                    self._claimed.add(cell)
+                    new_cells.append(cell)
+            if missing:
+                self._waiting[id(table)] = (table, missing)
+                for cell in missing:
+                    self._tables_by_cell.setdefault(cell, []).append(id(table))
+        return new_cells, missing
+
+    def resolve(self, translations: Dict[str, Optional[str]]) -> List[TableContent]:
+        # Returns the tables that have no missing cells left
+        completed = []
+        with self._lock:
+            self._translations.update(translations)
+            for cell in translations:
+                for table_id in self._tables_by_cell.pop(cell, []):
+                    table, missing = self._waiting[table_id]
+                    missing.discard(cell)
+                    if not missing:
+                        del self._waiting[table_id]
+                        completed.append(table)
+        return completed
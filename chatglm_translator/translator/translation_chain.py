@@ -2,12 +2,21 @@ from langchain_openai import ChatOpenAI
 from langchain_community.chat_models import ChatZhipuAI
 from langchain.chains import LLMChain
 
+import time
+from typing import Optional
 from utils import LOG
+from utils.metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_TOKENS
+from translator.segment_packer import estimate_tokens
+from translator.rate_limiter import AdaptiveRateLimiter
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
 
 class TranslationChain:
-    def __init__(self, model_name: str = "ChatGLM2-6B", verbose: bool = True):
-        
+    def __init__(self, model_name: str = "ChatGLM2-6B", verbose: bool = True,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, chat_model=None):
+        self.model_name = model_name
+        # 限流与重试：429 / 超时会退避重试，而不是直接变成缺失的翻译
+        self.rate_limiter = rate_limiter
+
         # 翻译任务指令始终由 System 角色承担
         template = (
             """You are a translation expert, proficient in various languages. \n
@@ -27,21 +36,33 @@ class TranslationChain:
 
         # 为了翻译结果的稳定性，将 temperature 设置为 0
         # chat = ChatOpenAI(model_name=model_name, temperature=0, verbose=verbose)
-        chat = ChatZhipuAI(model=model_name, temperature=0.5,)
+        # chat_model 可替换为其他 LangChain Chat 模型，例如基准测试使用的本地 FakeChatModel
+        chat = chat_model if chat_model is not None else ChatZhipuAI(model=model_name, temperature=0.5,)
 
         self.chain = LLMChain(llm=chat, prompt=chat_prompt_template, verbose=verbose)
 
     def run(self, text: str, style: str, source_language: str, target_language: str) -> (str, bool):
         result = ""
+        inputs = {
+            "text": text,
+            "style": style,
+            "source_language": source_language,
+            "target_language": target_language,
+        }
+        LLM_TOKENS.inc(estimate_tokens(text), direction="input")
+        start = time.perf_counter()
         try:
-            result = self.chain.run({
-                "text": text,
-                "style": style,
-                "source_language": source_language,
-                "target_language": target_language,
-            })
+            if self.rate_limiter is not None:
+                result = self.rate_limiter.call(self.chain.run, inputs)
+            else:
+                result = self.chain.run(inputs)
         except Exception as e:
             LOG.error(f"An error occurred during translation: {e}")
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, status="error")
+            LLM_REQUESTS.inc(status="error")
             return result, False
 
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, status="ok")
+        LLM_REQUESTS.inc(status="ok")
+        LLM_TOKENS.inc(estimate_tokens(result), direction="output")
         return result, True
\ No newline at end of file
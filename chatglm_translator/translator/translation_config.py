@@ -15,7 +15,7 @@ class TranslationConfig:
 
         # Use the argparse Namespace to update the configuration
         overridden_values = {
-            key: value for key, value in vars(args).items() if key in config and value is not None
+            key: value for key, value in vars(args).items() if value is not None
         }
         config.update(overridden_values)    
         
@@ -0,0 +1,53 @@
+import uuid
+from typing import Callable, Optional, Tuple
+from book import Content, Page
+from translator.job_journal import JobJournal
+from translator.boilerplate import BoilerplateCache
+from translator.table_translator import TableCellIndex
+
+
+class TranslationJob:
+    # Per-call settings and state, so that one PDFTranslator can serve several jobs at once
+    def __init__(self,
+                 input_file: str,
+                 style: str,
+                 source_language: str,
+                 target_language: str,
+                 journal: Optional[JobJournal] = None,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 weight: float = 1.0):
+        self.job_id = uuid.uuid4().hex
+        self.input_file = input_file
+        self.style = style
+        self.source_language = source_language
+        self.target_language = target_language
+        self.journal = journal
+        self.progress_callback = progress_callback
+        # Share of the scheduler's request slots relative to other running jobs
+        self.weight = weight
+        # id(content) -> (page_idx, content_idx)
+        self._positions = {}
+        # Keyed by locate(content) rather than id(), since the stream frees pages and ids get reused;
+        # entries are dropped once their segment finishes
+        # (page_idx, content_idx) -> (earlier source, earlier translation) for segments edited since a previous edition
+        self.references = {}
+        # (page_idx, content_idx) -> similar earlier translations from the translation memory, sent as few-shot examples
+        self.examples = {}
+        # Unique table cell strings of the whole book, each translated once
+        self.table_cells = TableCellIndex()
+        # Headers and footers translated once and reused on every page
+        self.boilerplate = BoilerplateCache()
+        # Segments and table cells passed through untouched by the SegmentFilter
+        self.skipped = 0
+        self.skipped_cells = 0
+
+    def register_page(self, page_idx: int, page: Page):
+        for content_idx, content in enumerate(page.contents):
+            self._positions[id(content)] = (page_idx, content_idx)
+
+    def locate(self, content: Content) -> Tuple[int, int]:
+        return self._positions[id(content)]
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from translator.fuzzy_match import FuzzyMatch, jaccard, lsh_bands, shingles
+from utils import LOG
+
+# Upper bound on LSH candidates verified per lookup
+MAX_FUZZY_CANDIDATES = 200
+
+
+class TranslationMemory:
+    def __init__(self, db_path: str = "translation_memory.db", max_entries: int = 100000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # The connection is shared by the translator's worker threads, guarded by self._lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        # Source text and MinHash LSH bands for fuzzy lookups; memories created before this have no sources
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(translations)")}
+        if "source" not in columns:
+            self._conn.execute("ALTER TABLE translations ADD COLUMN source TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS fuzzy_bands (band TEXT NOT NULL, key TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fuzzy_bands_band ON fuzzy_bands (band)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fuzzy_bands_key ON fuzzy_bands (key)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip()
+
+    @classmethod
+    def make_key(cls, text: str, style: str, source_language: str, target_language: str, model_name: str) -> str:
+        payload = json.dumps(
+            [cls.normalize(text), style, source_language, target_language, model_name], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, translation: str, source: Optional[str] = None, scope: Optional[str] = None):
+        # With a source and a scope (style, languages and model) the entry is also indexed for find_similar
+        bands = lsh_bands(shingles(source)) if source is not None and scope is not None else []
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, translation, last_used, source) VALUES (?, ?, ?, ?)",
+                (key, translation, time.time(), source),
+            )
+            self._conn.execute("DELETE FROM fuzzy_bands WHERE key = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO fuzzy_bands (band, key) VALUES (?, ?)", [(f"{scope}:{band}", key) for band in bands]
+            )
+            self._evict()
+            self._conn.commit()
+
+    def find_similar(self, source: str, scope: str, threshold: float, limit: int = 3) -> List[FuzzyMatch]:
+        # Candidates come from the LSH band index, so a lookup never scans the whole memory
+        source_shingles = shingles(source)
+        bands = [f"{scope}:{band}" for band in lsh_bands(source_shingles)]
+        if not bands:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, translation FROM translations WHERE source IS NOT NULL AND key IN "
+                f"(SELECT DISTINCT key FROM fuzzy_bands WHERE band IN ({', '.join('?' * len(bands))}) LIMIT ?)",
+                (*bands, MAX_FUZZY_CANDIDATES),
+            ).fetchall()
+
+        matches = []
+        for candidate, translation in rows:
+            similarity = jaccard(source_shingles, shingles(candidate))
+            if similarity >= threshold:
+                matches.append(FuzzyMatch(candidate, translation, similarity))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches[:limit]
+
+    def _evict(self):
+        # Drop the least recently used entries once the memory grows past max_entries
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            evicted = self._conn.execute(
+                "SELECT key FROM translations ORDER BY last_used ASC LIMIT ?", (overflow,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM translations WHERE key = ?", evicted)
+            self._conn.executemany("DELETE FROM fuzzy_bands WHERE key = ?", evicted)
+            LOG.debug(f"[translation_memory] evicted {overflow} entries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
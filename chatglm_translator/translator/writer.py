@@ -1,26 +1,54 @@
 import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 from reportlab.lib import colors, pagesizes, units
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 )
 
-from book import Book, ContentType
+from book import Book, Page, ContentType
+from translator.font_registry import FontRegistry
 from utils import LOG
+from utils.metrics import WRITE_SECONDS
+
+def _merge_pdf_parts(pdf_writer_class, part_paths: List[str], output_file_path: str):
+    if len(part_paths) == 1:
+        shutil.move(part_paths[0], output_file_path)
+        return
+    merger = pdf_writer_class()
+    for part_path in part_paths:
+        merger.append(part_path)
+    with open(output_file_path, 'wb') as output_file:
+        merger.write(output_file)
+
+
+def _render_pdf_chunk(fonts: Dict[str, str], default_font: str, pages: List[Page], output_file_path: str) -> str:
+    # Runs in a worker process, which registers the font for itself
+    writer = Writer(FontRegistry(fonts, default_font))
+    writer._build_pdf(pages, output_file_path)
+    return output_file_path
+
 
 class Writer:
-    def __init__(self):
-        pass
+    def __init__(self, font_registry: FontRegistry = None, render_workers: int = 1, render_chunk_pages: int = 50):
+        self.font_registry = font_registry or FontRegistry()
+        # PDF export renders chunks of pages in this many processes; 1 builds the document in one go
+        self.render_workers = max(1, render_workers)
+        self.render_chunk_pages = max(1, render_chunk_pages)
 
-    def save_translated_book(self, book: Book, ouput_file_format: str):
+    def save_translated_book(self, book: Book, ouput_file_format: str, output_file_path: str = None):
         LOG.debug(ouput_file_format)
 
         if ouput_file_format.lower() == "pdf":
-            output_file_path = self._save_translated_book_pdf(book)
+            with WRITE_SECONDS.time(format="pdf"):
+                output_file_path = self._save_translated_book_pdf(book, output_file_path)
         elif ouput_file_format.lower() == "markdown":
-            output_file_path = self._save_translated_book_markdown(book)
+            with WRITE_SECONDS.time(format="markdown"):
+                output_file_path = self._save_translated_book_markdown(book, output_file_path)
         else:
             LOG.error(f"不支持文件类型: {ouput_file_format}")
             return ""
@@ -29,86 +57,267 @@ class Writer:
 
         return output_file_path
 
+    def open_book_stream(self, pdf_file_path: str, ouput_file_format: str, output_file_path: str = None):
+        # Returns a writer that accepts translated pages one at a time, see translate_pdf_stream
+        LOG.debug(ouput_file_format)
+
+        if ouput_file_format.lower() == "pdf":
+            return PDFBookStream(self, pdf_file_path, output_file_path)
+        elif ouput_file_format.lower() == "markdown":
+            return MarkdownBookStream(self, pdf_file_path, output_file_path)
+
+        raise ValueError(f"不支持文件类型: {ouput_file_format}")
+
 
     def _save_translated_book_pdf(self, book: Book, output_file_path: str = None):
 
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.pdf')
+        output_file_path = output_file_path or book.pdf_file_path.replace('.pdf', f'_translated.pdf')
 
         LOG.info(f"开始导出: {output_file_path}")
 
-        # Register Chinese font
-        font_path = "../fonts/simsun.ttc"  # 请将此路径替换为您的字体文件路径
-        pdfmetrics.registerFont(TTFont("SimSun", font_path))
+        if self.render_workers > 1 and len(book.pages) > self.render_chunk_pages:
+            return self._save_pdf_in_chunks(book.pages, output_file_path)
 
-        # Create a new ParagraphStyle with the SimSun font
-        simsun_style = ParagraphStyle('SimSun', fontName='SimSun', fontSize=12, leading=14)
+        self._build_pdf(book.pages, output_file_path)
+        return output_file_path
+
+    def _build_pdf(self, pages: List[Page], output_file_path: str):
+        simsun_style = self._register_pdf_font()
 
         # Create a PDF document
         doc = SimpleDocTemplate(output_file_path, pagesize=pagesizes.letter)
-        styles = getSampleStyleSheet()
         story = []
 
         # Iterate over the pages and contents
-        for page in book.pages:
-            for content in page.contents:
-                if content.status:
-                    if content.content_type == ContentType.TEXT:
-                        # Add translated text to the PDF
-                        text = content.translation
-                        para = Paragraph(text, simsun_style)
-                        story.append(para)
-
-                    elif content.content_type == ContentType.TABLE:
-                        # Add table to the PDF
-                        table = content.translation
-                        table_style = TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'SimSun'),  # 更改表头字体为 "SimSun"
-                            ('FONTSIZE', (0, 0), (-1, 0), 14),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                            ('FONTNAME', (0, 1), (-1, -1), 'SimSun'),  # 更改表格中的字体为 "SimSun"
-                            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                        ])
-                        pdf_table = Table(table.values.tolist())
-                        pdf_table.setStyle(table_style)
-                        story.append(pdf_table)
+        for page_idx, page in enumerate(pages):
+            story.extend(self._page_to_flowables(page, simsun_style))
             # Add a page break after each page except the last one
-            if page != book.pages[-1]:
+            if page_idx != len(pages) - 1:
                 story.append(PageBreak())
 
         # Save the translated book as a new PDF file
         doc.build(story)
+
+    def _save_pdf_in_chunks(self, pages: List[Page], output_file_path: str) -> str:
+        try:
+            from pypdf import PdfWriter
+        except ImportError:
+            LOG.warning("未安装 pypdf，无法合并分块渲染结果，改为单进程导出")
+            self._build_pdf(pages, output_file_path)
+            return output_file_path
+
+        chunks = [pages[start:start + self.render_chunk_pages] for start in range(0, len(pages), self.render_chunk_pages)]
+        LOG.debug(f"[pdf] {len(pages)} pages in {len(chunks)} chunks on {self.render_workers} processes")
+
+        # Every chunk starts on a new page, just like the PageBreak between pages in a single build
+        part_dir = tempfile.mkdtemp(prefix="translated_parts_", dir=os.path.dirname(os.path.abspath(output_file_path)))
+        try:
+            part_paths = [os.path.join(part_dir, f"part_{index:05d}.pdf") for index in range(len(chunks))]
+            fonts, default_font = self.font_registry.fonts, self.font_registry.default_font
+            with ProcessPoolExecutor(max_workers=self.render_workers) as executor:
+                list(executor.map(
+                    _render_pdf_chunk,
+                    [fonts] * len(chunks),
+                    [default_font] * len(chunks),
+                    chunks,
+                    part_paths,
+                ))
+
+            _merge_pdf_parts(PdfWriter, part_paths, output_file_path)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
         return output_file_path
 
+    def _register_pdf_font(self) -> ParagraphStyle:
+        # Register Chinese font once per process and reuse its ParagraphStyle
+        return self.font_registry.paragraph_style()
+
+    def _page_to_flowables(self, page: Page, simsun_style: ParagraphStyle) -> List:
+        flowables = []
+        for content in page.contents:
+            if content.status:
+                if content.content_type == ContentType.TEXT:
+                    # Add translated text to the PDF
+                    text = content.translation
+                    para = Paragraph(text, simsun_style)
+                    flowables.append(para)
+
+                elif content.content_type == ContentType.TABLE:
+                    # Add table to the PDF, header row first
+                    rows = content.rows(translated=True)
+                    table_style = TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('FONTNAME', (0, 0), (-1, 0), simsun_style.fontName),  # 更改表头字体为 "SimSun"
+                        ('FONTSIZE', (0, 0), (-1, 0), 14),
+                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                        ('FONTNAME', (0, 1), (-1, -1), simsun_style.fontName),  # 更改表格中的字体为 "SimSun"
+                        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                    ])
+                    pdf_table = Table(rows)
+                    pdf_table.setStyle(table_style)
+                    flowables.append(pdf_table)
+        return flowables
+
 
     def _save_translated_book_markdown(self, book: Book, output_file_path: str = None):
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.md')
+        output_file_path = output_file_path or book.pdf_file_path.replace('.pdf', f'_translated.md')
 
         LOG.info(f"开始导出: {output_file_path}")
         with open(output_file_path, 'w', encoding='utf-8') as output_file:
             # Iterate over the pages and contents
             for page in book.pages:
-                for content in page.contents:
-                    if content.status:
-                        if content.content_type == ContentType.TEXT:
-                            # Add translated text to the Markdown file
-                            text = content.translation
-                            output_file.write(text + '\n\n')
-
-                        elif content.content_type == ContentType.TABLE:
-                            # Add table to the Markdown file
-                            table = content.translation
-                            header = '| ' + ' | '.join(str(column) for column in table.columns) + ' |' + '\n'
-                            separator = '| ' + ' | '.join(['---'] * len(table.columns)) + ' |' + '\n'
-                            # body = '\n'.join(['| ' + ' | '.join(row) + ' |' for row in table.values.tolist()]) + '\n\n'
-                            body = '\n'.join(['| ' + ' | '.join(str(cell) for cell in row) + ' |' for row in table.values.tolist()]) + '\n\n'
-                            output_file.write(header + separator + body)
+                output_file.write(self.page_to_markdown(page))
 
                 # Add a page break (horizontal rule) after each page except the last one
                 if page != book.pages[-1]:
                     output_file.write('---\n\n')
 
-        return output_file_path
\ No newline at end of file
+        return output_file_path
+
+    def page_to_markdown(self, page: Page) -> str:
+        parts = []
+        for content in page.contents:
+            if content.status:
+                if content.content_type == ContentType.TEXT:
+                    # Add translated text to the Markdown file
+                    text = content.translation
+                    parts.append(text + '\n\n')
+
+                elif content.content_type == ContentType.TABLE:
+                    # Add table to the Markdown file
+                    header_row, *data_rows = content.rows(translated=True)
+                    header = '| ' + ' | '.join(header_row) + ' |' + '\n'
+                    separator = '| ' + ' | '.join(['---'] * len(header_row)) + ' |' + '\n'
+                    body = '\n'.join(['| ' + ' | '.join(row) + ' |' for row in data_rows]) + '\n\n'
+                    parts.append(header + separator + body)
+        return ''.join(parts)
+
+
+class MarkdownBookStream:
+    # Pages go to a temporary file next to the output, which replaces the output only once the run succeeded
+    def __init__(self, writer: Writer, pdf_file_path: str, output_file_path: str = None):
+        self.writer = writer
+        self.output_file_path = output_file_path or pdf_file_path.replace('.pdf', f'_translated.md')
+        self.pages_written = 0
+
+        LOG.info(f"开始导出: {self.output_file_path}")
+        fd, self._partial_path = tempfile.mkstemp(
+            prefix=".translated_", suffix=".md.part", dir=os.path.dirname(os.path.abspath(self.output_file_path)))
+        self._output_file = os.fdopen(fd, 'w', encoding='utf-8')
+
+    def write_page(self, page: Page):
+        # Pages arrive one by one, so the separator goes before every page except the first
+        if self.pages_written:
+            self._output_file.write('---\n\n')
+        self._output_file.write(self.writer.page_to_markdown(page))
+        self._output_file.flush()
+        self.pages_written += 1
+
+    def close(self) -> str:
+        try:
+            self._output_file.close()
+            os.replace(self._partial_path, self.output_file_path)
+        except BaseException:
+            self.abort()
+            raise
+        LOG.info(f"翻译完成，文件保存至: {self.output_file_path}")
+        return self.output_file_path
+
+    def abort(self):
+        # The run failed: leave any earlier output untouched and remove the partial file. Errors are
+        # only logged so that they do not hide the exception that stopped the run.
+        try:
+            self._output_file.close()
+        except OSError as e:
+            LOG.warning(f"关闭临时文件失败: {e}")
+        try:
+            os.remove(self._partial_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            LOG.warning(f"删除临时文件失败: {self._partial_path}: {e}")
+
+
+class PDFBookStream:
+    # Pages are rendered in chunks of render_chunk_pages to part files as they arrive (in render_workers
+    # processes when configured) and the parts are merged on close, so memory stays bounded by one chunk
+    # plus the chunks being rendered
+    def __init__(self, writer: Writer, pdf_file_path: str, output_file_path: str = None):
+        self.writer = writer
+        self.output_file_path = output_file_path or pdf_file_path.replace('.pdf', f'_translated.pdf')
+        self.pages_written = 0
+        self._pending_pages = []
+        self._part_paths = []
+        self._renders = deque()
+        self._executor = None
+
+        try:
+            from pypdf import PdfWriter
+            self._pdf_writer_class = PdfWriter
+        except ImportError:
+            # Without pypdf the parts cannot be merged, so the whole book is built in one go on close
+            LOG.warning("未安装 pypdf，PDF 流式导出将在结束时一次性生成整本书")
+            self._pdf_writer_class = None
+
+        self._part_dir = tempfile.mkdtemp(
+            prefix="translated_parts_", dir=os.path.dirname(os.path.abspath(self.output_file_path)))
+        if self._pdf_writer_class is not None and writer.render_workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=writer.render_workers)
+
+        LOG.info(f"开始导出: {self.output_file_path}")
+
+    def write_page(self, page: Page):
+        self._pending_pages.append(page)
+        self.pages_written += 1
+        if self._pdf_writer_class is not None and len(self._pending_pages) >= self.writer.render_chunk_pages:
+            self._render_pending()
+
+    def _render_pending(self):
+        # Every chunk starts on a new page, just like the PageBreak between pages in a single build
+        pages, self._pending_pages = self._pending_pages, []
+        part_path = os.path.join(self._part_dir, f"part_{len(self._part_paths):05d}.pdf")
+        self._part_paths.append(part_path)
+        if self._executor is None:
+            self.writer._build_pdf(pages, part_path)
+            return
+
+        fonts, default_font = self.writer.font_registry.fonts, self.writer.font_registry.default_font
+        self._renders.append(self._executor.submit(_render_pdf_chunk, fonts, default_font, pages, part_path))
+        # Keep at most two chunks per worker in flight so that slow rendering cannot pile pages up in memory
+        while len(self._renders) > self.writer.render_workers * 2:
+            self._renders.popleft().result()
+
+    def close(self) -> str:
+        # Everything is built inside the part directory and moved over the output only at the end
+        built_path = os.path.join(self._part_dir, "translated.pdf")
+        try:
+            if self._pdf_writer_class is None:
+                self.writer._build_pdf(self._pending_pages, built_path)
+            else:
+                if self._pending_pages or not self._part_paths:
+                    self._render_pending()
+                while self._renders:
+                    self._renders.popleft().result()
+                _merge_pdf_parts(self._pdf_writer_class, self._part_paths, built_path)
+            os.replace(built_path, self.output_file_path)
+        finally:
+            self._discard()
+
+        LOG.info(f"翻译完成，文件保存至: {self.output_file_path}")
+        return self.output_file_path
+
+    def abort(self):
+        # The run failed: skip the merge, leave any earlier output untouched and remove the parts
+        self._discard()
+
+    def _discard(self):
+        self._pending_pages = []
+        self._renders.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        shutil.rmtree(self._part_dir, ignore_errors=True)
@@ -6,9 +6,36 @@ class ArgumentParser:
         self.parser.add_argument('--config_file', type=str, default='config.yaml', help='Configuration file with model and API settings.')
         self.parser.add_argument('--model_name', type=str, help='Name of the Large Language Model.')
         self.parser.add_argument('--input_file', type=str, help='PDF file to translate.')
+        self.parser.add_argument('--batch', type=str, help='Directory or glob pattern of PDF files to translate in one process.')
+        self.parser.add_argument('--batch_workers', type=int, help='Number of files translated at the same time in batch mode.')
+        self.parser.add_argument('--batch_report', type=str, help='Write a JSON report of the batch run to this file.')
         self.parser.add_argument('--output_file_format', type=str, help='The file format of translated book. Now supporting PDF and Markdown')
+        self.parser.add_argument('--font_path', type=str, help='TrueType/TTC font used for translated PDF output.')
+        self.parser.add_argument('--font_name', type=str, help='Name under which --font_path is registered (default: SimSun).')
+        self.parser.add_argument('--render_workers', type=int, help='Number of processes rendering chunks of a translated PDF in parallel.')
         self.parser.add_argument('--source_language', type=str, help='The language of the original book to be translated.')
         self.parser.add_argument('--target_language', type=str, help='The target language for translating the original book.')
+        self.parser.add_argument('--target_languages', type=str, help='Comma-separated target languages translated from a single parse, one output file each, e.g. "German,French,Spanish".')
+        self.parser.add_argument('--pages', type=str, help='Pages to translate, e.g. "250-260,300" (default: all pages).')
+        self.parser.add_argument('--max_workers', type=int, help='Number of translation requests kept in flight concurrently.')
+        self.parser.add_argument('--packing_token_budget', type=int, help='Pack short text segments into one request up to this many tokens (0 disables packing).')
+        self.parser.add_argument('--translation_memory', type=str, help='SQLite file used as a persistent translation memory (disabled when unset).')
+        self.parser.add_argument('--translation_memory_max_entries', type=int, help='Maximum number of entries kept in the translation memory before the least recently used are evicted.')
+        self.parser.add_argument('--fuzzy_threshold', type=float, help='Similarity (0-1) above which near-duplicate segments in the translation memory are reused or given as examples (default: 0.6, 0 disables).')
+        self.parser.add_argument('--parse_workers', type=int, help='Number of processes used to parse the PDF in parallel.')
+        self.parser.add_argument('--job_workers', type=int, help='Number of background workers processing translation jobs in the Flask server.')
+        self.parser.add_argument('--job_ttl', type=float, help='Seconds a finished job stays queryable in the Flask server before it is forgotten (default: 86400).')
+        self.parser.add_argument('--scheduler_concurrency', type=int, help='Total LLM requests in flight shared fairly by all jobs in the process (disabled when unset).')
+        self.parser.add_argument('--scheduler_per_job_limit', type=int, help='Maximum LLM requests in flight for a single job under the shared scheduler.')
+        self.parser.add_argument('--rate_limit', type=float, help='Maximum LLM requests per second; enables adaptive concurrency and retries with backoff.')
+        self.parser.add_argument('--rate_limit_max_concurrency', type=int, help='Upper bound for the adaptive LLM concurrency limit.')
+        self.parser.add_argument('--rate_limit_max_retries', type=int, help='Retries for a request that hit a rate limit or timeout.')
+        self.parser.add_argument('--previous_edition', type=str, help='PDF (or its journal) of an earlier, already translated edition; only new or changed segments are sent to the LLM.')
+        self.parser.add_argument('--glossary', type=str, help='Glossary file (.csv/.tsv with a "term,<language>..." header, or .json/.yaml); only the terms found in a segment are added to its prompt.')
+        self.parser.add_argument('--boilerplate', type=str, choices=['reuse', 'drop', 'keep'], help='Running headers/footers repeated across pages: translate once and reuse (default), drop them, or keep them as ordinary text.')
+        self.parser.add_argument('--disable_skip_filter', action='store_true', default=None, help='Send every segment to the LLM, including page numbers, URLs, numbers, code and text already in the target language.')
+        self.parser.add_argument('--resume', action='store_true', default=None, help='Resume an interrupted translation from its job journal, retrying only unfinished or failed segments.')
+        self.parser.add_argument('--stream', action='store_true', default=None, help='Parse, translate and write the book page by page instead of loading it all into memory (PDF output is rendered in chunks of pages and needs pypdf to merge them).')
 
     def parse_arguments(self):
         args = self.parser.parse_args()
@@ -0,0 +1,52 @@
+from typing import Iterable, List, Optional, Union
+
+PageSelection = Union[None, int, str, Iterable[int]]
+
+
+def parse_page_spec(spec: str) -> List[int]:
+    # "250-260,300" -> [250, 251, ..., 260, 300]; page numbers are 1-based as shown in PDF viewers
+    page_numbers = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, _, end = part.partition("-")
+            if not start.isdigit() or not end.isdigit() or int(start) < 1 or int(start) > int(end):
+                raise ValueError(f"Invalid page range: '{part}'")
+            page_numbers.update(range(int(start), int(end) + 1))
+        else:
+            if not part.isdigit() or int(part) < 1:
+                raise ValueError(f"Invalid page number: '{part}'")
+            page_numbers.add(int(part))
+
+    if not page_numbers:
+        raise ValueError(f"No pages selected by '{spec}'")
+    return sorted(page_numbers)
+
+
+def normalize_pages(pages: PageSelection) -> Optional[List[int]]:
+    # None selects every page and an int keeps the historic "first N pages" meaning
+    if pages is None:
+        return None
+    if isinstance(pages, int):
+        return list(range(1, pages + 1))
+    if isinstance(pages, str):
+        return parse_page_spec(pages)
+    return sorted(set(int(page) for page in pages))
+
+
+def is_page_subset(pages: PageSelection) -> bool:
+    # Whether the selection is a range or list rather than the whole book or its first N pages
+    return pages is not None and not isinstance(pages, int)
+
+
+def page_spec_label(pages: PageSelection) -> str:
+    # Compact label for file names, e.g. [250, ..., 260, 300] -> "250-260_300"
+    page_numbers = normalize_pages(pages) or []
+    groups = []
+    for page_number in page_numbers:
+        if groups and page_number == groups[-1][1] + 1:
+            groups[-1][1] = page_number
+        else:
+            groups.append([page_number, page_number])
+    return "_".join(str(start) if start == end else f"{start}-{end}" for start, end in groups)